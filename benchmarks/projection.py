@@ -0,0 +1,38 @@
+"""
+Time nerd.io.projection against the utm package on random points.
+
+Usage: python benchmarks/projection.py [n_points]
+"""
+
+import sys
+import time
+
+import numpy as np
+import utm
+
+from nerd.io import projection
+
+
+def main(n_points: int = 10**7) -> None:
+    rng = np.random.default_rng(0)
+    latitude = rng.uniform(28, 29, n_points)
+    longitude = rng.uniform(-118.5, -117.5, n_points)
+    start = time.perf_counter()
+    easting, northing, _, _ = projection.from_latlon(latitude, longitude, 11)
+    forward = time.perf_counter() - start
+    start = time.perf_counter()
+    projection.to_latlon(easting, northing, 11, True)
+    inverse = time.perf_counter() - start
+    start = time.perf_counter()
+    expected = utm.from_latlon(latitude, longitude, force_zone_number=11)
+    reference = time.perf_counter() - start
+    difference = max(np.abs(easting - expected[0]).max(), np.abs(northing - expected[1]).max())
+    print("points: {}".format(n_points))
+    print("nerd.io.projection forward: {:.2f} s".format(forward))
+    print("nerd.io.projection inverse: {:.2f} s".format(inverse))
+    print("utm.from_latlon: {:.2f} s".format(reference))
+    print("largest difference with utm: {:.2e} m".format(difference))
+
+
+if __name__ == "__main__":
+    main(*[int(argument) for argument in sys.argv[1:]])
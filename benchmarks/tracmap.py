@@ -0,0 +1,58 @@
+"""
+Time the typed tracmap parser against generic pandas parsing, on a file made of copies of
+tests/data/280320-06-95mm.txt.
+
+Usage: python benchmarks/tracmap.py [n_copies]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+from nerd.io.import_data import column_names, _read_tracmap
+
+tracmap_filename = "tests/data/280320-06-95mm.txt"
+
+
+def generic_parser(filename: str) -> pd.DataFrame:
+    tracmap_data = pd.read_csv(
+        filename, header=None, names=column_names, usecols=[i for i in range(1, 9)]
+    )
+    tracmap_data["timestamp"] = pd.to_datetime(
+        tracmap_data["date"].astype(str).str.zfill(8) + tracmap_data["time"],
+        format="%d%m%Y%H:%M:%S",
+    )
+    return tracmap_data
+
+
+def main(n_copies: int = 250) -> None:
+    with open(tracmap_filename, "rb") as tracmap_file:
+        content = tracmap_file.read().rstrip(b"\n") + b"\n"
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "tracks.txt")
+        with open(filename, "wb") as benchmark_file:
+            benchmark_file.write(content * n_copies)
+        size = os.path.getsize(filename) / 1e6
+        start = time.perf_counter()
+        expected = generic_parser(filename)
+        generic = time.perf_counter() - start
+        start = time.perf_counter()
+        obtained = _read_tracmap(filename)
+        typed = time.perf_counter() - start
+    assert (obtained.timestamp.to_numpy() == expected.timestamp.to_numpy()).all()
+    print("rows: {}, size: {:.1f} MB".format(len(obtained), size))
+    print("read_csv + to_datetime: {:.2f} s ({:.0f} MB/s)".format(generic, size / generic))
+    print("_read_tracmap: {:.2f} s ({:.0f} MB/s)".format(typed, size / typed))
+    print(
+        "memory: {:.1f} MB -> {:.1f} MB".format(
+            expected.memory_usage(deep=True).sum() / 1e6,
+            obtained.memory_usage(deep=True).sum() / 1e6,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main(*[int(argument) for argument in sys.argv[1:]])
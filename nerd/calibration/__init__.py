@@ -1,5 +1,16 @@
-from nerd.calibration.fit_flow_rate import fit_flow_rate  # noqa
+from nerd.calibration.fit_flow_rate import fit_flow_rate, fit_flow_rate_covariance  # noqa
 from nerd.calibration.get_swath_width import get_swath_width  # noqa
 from nerd.calibration.model import model  # noqa
 from nerd.calibration.rmse import _get_rmse  # noqa
 from nerd.calibration.best_density_function import *  # noqa
+from nerd.calibration.swath_width_search import fit_swath_width_and_density_function  # noqa
+from nerd.calibration.trials import calibrate_trials  # noqa
+from nerd.calibration.uncertainty import (  # noqa
+    sample_flow_rate_coefficients,
+    model_percentiles,
+    density_map_percentiles,
+    swath_width_offsets,
+)
+from nerd.calibration.aperture_table import ApertureTable  # noqa
+from nerd.calibration.fit_shape import fit_normal_spread  # noqa
+from nerd.calibration.flow_rate_model import FlowRateModel  # noqa
@@ -0,0 +1,184 @@
+from typing import Callable, Union
+import numpy as np
+
+
+class ApertureTable:
+    """
+    Precomputed nadir density over a grid of helicopter speeds and aperture diameters, inverted to
+    recommend the aperture diameter that gives a target density at a given speed.
+
+    Queries interpolate between grid nodes with NumPy only, so a table loaded from disk answers
+    them without solving the density model.
+
+    Attributes:
+    -----------
+    helicopter_speeds : np.ndarray
+        Increasing speeds (m/s) of the grid.
+    aperture_diameters : np.ndarray
+        Increasing aperture diameters (mm) of the grid.
+    nadir_density : np.ndarray
+        Density (kg/m^2) directly below the helicopter, with one row per speed and one column per
+        aperture diameter (as returned by calibration.model).
+    """
+
+    def __init__(
+        self,
+        helicopter_speeds: np.ndarray,
+        aperture_diameters: np.ndarray,
+        nadir_density: np.ndarray,
+    ):
+        self.helicopter_speeds = np.asarray(helicopter_speeds, dtype=float)
+        self.aperture_diameters = np.asarray(aperture_diameters, dtype=float)
+        self.nadir_density = np.asarray(nadir_density, dtype=float)
+        expected_shape = (len(self.helicopter_speeds), len(self.aperture_diameters))
+        if self.nadir_density.shape != expected_shape:
+            raise ValueError(
+                "nadir_density must have shape {}, not {}".format(
+                    expected_shape, self.nadir_density.shape
+                )
+            )
+        # Density times speed is the same for every speed when the profile is linear in its free
+        # parameter, so interpolating it along the speed axis is exact in that case.
+        self._mass_factor = self.nadir_density * self.helicopter_speeds[:, np.newaxis]
+
+    @classmethod
+    def from_model(
+        cls,
+        aperture_diameters: np.ndarray,
+        helicopter_speeds: np.ndarray,
+        swath_width: float,
+        density_function: Callable,
+        flow_rate_function: Callable,
+    ) -> "ApertureTable":
+        """
+        Build the table with calibration.model
+        :param aperture_diameters: Increasing aperture diameters (mm) of the grid
+        :param helicopter_speeds: Increasing helicopter speeds (m/s) of the grid
+        :param swath_width: Width (m) of dispersion swath
+        :param density_function: Function for density (kg/m^2) profile with
+            respect to perpendicular distance (m) to flight path, swath width (m),
+            and scale factor
+        :param flow_rate_function: Function of mass flow rate (kg/s) with respect
+            to aperture diameter (mm)
+        :return: ApertureTable
+        """
+        from nerd.calibration.model import model
+
+        nadir_density = model(
+            aperture_diameters, helicopter_speeds, swath_width, density_function, flow_rate_function
+        )
+        return cls(helicopter_speeds, aperture_diameters, nadir_density)
+
+    def recommend_aperture(
+        self,
+        target_density: Union[float, np.ndarray],
+        helicopter_speed: Union[float, np.ndarray],
+    ) -> np.ndarray:
+        """
+        Smallest aperture diameter that gives the target nadir density at the
+            given speed
+        :param target_density: Target density (kg/m^2) directly below the
+            helicopter
+        :param helicopter_speed: Speed (m/s) of the helicopter
+        :return: Aperture diameter (mm) with the broadcast shape of the inputs;
+            NaN where the target or the speed is outside of the table
+        """
+        target_density, helicopter_speed = np.broadcast_arrays(
+            np.asarray(target_density, dtype=float), np.asarray(helicopter_speed, dtype=float)
+        )
+        shape = target_density.shape
+        target_density = np.ravel(target_density)
+        helicopter_speed = np.ravel(helicopter_speed)
+        density = self._interpolate_density(helicopter_speed)
+        is_reached = density >= target_density[:, np.newaxis]
+        i_upper = np.argmax(is_reached, axis=1)
+        i_lower = np.maximum(i_upper - 1, 0)
+        rows = np.arange(len(target_density))
+        lower_density = density[rows, i_lower]
+        upper_density = density[rows, i_upper]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            weight = np.where(
+                i_upper == i_lower,
+                0.0,
+                (target_density - lower_density) / (upper_density - lower_density),
+            )
+        aperture_diameter = self.aperture_diameters[i_lower] + weight * (
+            self.aperture_diameters[i_upper] - self.aperture_diameters[i_lower]
+        )
+        is_outside = (
+            ~is_reached.any(axis=1)
+            | (target_density < density[:, 0])
+            | (helicopter_speed < self.helicopter_speeds[0])
+            | (helicopter_speed > self.helicopter_speeds[-1])
+        )
+        aperture_diameter[is_outside] = np.nan
+        return aperture_diameter.reshape(shape)
+
+    def nadir_density_at(
+        self,
+        aperture_diameter: Union[float, np.ndarray],
+        helicopter_speed: Union[float, np.ndarray],
+    ) -> np.ndarray:
+        """
+        Interpolated density (kg/m^2) directly below the helicopter
+        :param aperture_diameter: Diameter (mm) of the dispersion bucket aperture
+        :param helicopter_speed: Speed (m/s) of the helicopter
+        :return: Density with the broadcast shape of the inputs
+        """
+        aperture_diameter, helicopter_speed = np.broadcast_arrays(
+            np.asarray(aperture_diameter, dtype=float), np.asarray(helicopter_speed, dtype=float)
+        )
+        density = self._interpolate_density(np.ravel(helicopter_speed))
+        i_upper = np.clip(
+            np.searchsorted(self.aperture_diameters, np.ravel(aperture_diameter)),
+            1,
+            len(self.aperture_diameters) - 1,
+        )
+        i_lower = i_upper - 1
+        weight = (np.ravel(aperture_diameter) - self.aperture_diameters[i_lower]) / (
+            self.aperture_diameters[i_upper] - self.aperture_diameters[i_lower]
+        )
+        rows = np.arange(len(density))
+        nadir_density = (1 - weight) * density[rows, i_lower] + weight * density[rows, i_upper]
+        return nadir_density.reshape(aperture_diameter.shape)
+
+    def save(self, path: str) -> None:
+        """
+        Write the table to a NumPy .npz file
+        :param path: Output path
+        """
+        np.savez(
+            path,
+            helicopter_speeds=self.helicopter_speeds,
+            aperture_diameters=self.aperture_diameters,
+            nadir_density=self.nadir_density,
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "ApertureTable":
+        """
+        Read a table written by save
+        :param path: Path of the .npz file
+        :return: ApertureTable
+        """
+        with np.load(path) as table:
+            return cls(
+                table["helicopter_speeds"], table["aperture_diameters"], table["nadir_density"]
+            )
+
+    def _interpolate_density(self, helicopter_speed: np.ndarray) -> np.ndarray:
+        if len(self.helicopter_speeds) == 1:
+            return np.repeat(self.nadir_density, len(helicopter_speed), axis=0)
+        i_upper = np.clip(
+            np.searchsorted(self.helicopter_speeds, helicopter_speed),
+            1,
+            len(self.helicopter_speeds) - 1,
+        )
+        i_lower = i_upper - 1
+        weight = (helicopter_speed - self.helicopter_speeds[i_lower]) / (
+            self.helicopter_speeds[i_upper] - self.helicopter_speeds[i_lower]
+        )
+        mass_factor = (1 - weight[:, np.newaxis]) * self._mass_factor[i_lower] + weight[
+            :, np.newaxis
+        ] * self._mass_factor[i_upper]
+        return mass_factor / helicopter_speed[:, np.newaxis]
@@ -1,16 +1,12 @@
-from typing import Callable
-import inspect
+from typing import Callable, Optional
 import numpy as np
+import pandas as pd
 from nerd.calibration.rmse import _get_rmse_from_function_array
-from nerd import density_functions
+from nerd.density_functions import as_density_function, registered_density_functions
 
 
 def _get_density_functions_array() -> list:
-    return [
-        getattr(density_functions, element)
-        for element in dir(density_functions)
-        if inspect.isfunction(getattr(density_functions, element))
-    ]
+    return [density_function.function for density_function in registered_density_functions()]
 
 
 def _select_best_density_function_from_array(
@@ -21,6 +17,8 @@ def _select_best_density_function_from_array(
     swath_width: float,
     density_functions: list,
     flow_rate_function: Callable,
+    n_workers: Optional[int] = None,
+    executor: str = "thread",
 ) -> Callable:
     rmse = _get_rmse_from_function_array(
         distance,
@@ -30,11 +28,64 @@ def _select_best_density_function_from_array(
         swath_width,
         density_functions,
         flow_rate_function,
+        n_workers=n_workers,
+        executor=executor,
     )
     is_better_function = rmse == rmse.min()
     return density_functions[np.where(is_better_function)[0][0]]
 
 
+def get_density_functions_rmse(
+    distance: np.ndarray,
+    density: np.ndarray,
+    aperture_diameter_data: float,
+    helicopter_speed_data: float,
+    swath_width: float,
+    flow_rate_function: Callable,
+    density_functions: Optional[list] = None,
+    n_workers: Optional[int] = None,
+    executor: str = "thread",
+) -> pd.DataFrame:
+    """
+    Calculate the RMSE of every candidate density function
+    :param distance: Perpendicular distance in meters (m) from flight path
+    :param density: Density of bait in kilograms per square meter (kg/m^2)
+    :param aperture_diameter_data: Diameter (mm) of the dispersion bucket
+        aperture
+    :param helicopter_speed_data: Speed (m/s) of the helicopter during
+        dispersion of bait
+    :param swath_width: Width (m) of dispersion swath
+    :param flow_rate_function: Function of mass flow rate (kg/s) with respect to
+        aperture diameter (mm)
+    :param density_functions: Candidate density functions (defaults to the
+        functions registered in submodule nerd.density_functions)
+    :param n_workers: Number of workers used to score the candidates
+        concurrently. Serial if None
+    :param executor: "thread" or "process" (candidates must be picklable)
+    :return: Table with the name (`density_function`) and the `rmse` of each
+        candidate, in the order of the candidates
+    """
+    if density_functions is None:
+        density_functions = _get_density_functions_array()
+    rmse = _get_rmse_from_function_array(
+        distance,
+        density,
+        aperture_diameter_data,
+        helicopter_speed_data,
+        swath_width,
+        density_functions,
+        flow_rate_function,
+        n_workers=n_workers,
+        executor=executor,
+    )
+    return pd.DataFrame(
+        {
+            "density_function": [as_density_function(f).name for f in density_functions],
+            "rmse": rmse,
+        }
+    )
+
+
 def get_best_density_function(
     distance: np.ndarray,
     density: np.ndarray,
@@ -42,9 +93,12 @@ def get_best_density_function(
     helicopter_speed_data: float,
     swath_width: float,
     flow_rate_function: Callable,
+    density_functions: Optional[list] = None,
+    n_workers: Optional[int] = None,
+    executor: str = "thread",
 ) -> Callable:
     """
-    Select density function with minimum RMSE among the functions defined in
+    Select density function with minimum RMSE among the functions registered in
         submodule nerd.density_functions
     :param distance: Perpendicular distance in meters (m) from flight path
     :param density: Density of bait in kilograms per square meter (kg/m^2)
@@ -55,10 +109,16 @@ def get_best_density_function(
     :param swath_width: Width (m) of dispersion swath
     :param flow_rate_function: Function of mass flow rate (kg/s) with respect to
         aperture diameter (mm)
+    :param density_functions: Candidate density functions (defaults to the
+        registered ones)
+    :param n_workers: Number of workers used to score the candidates
+        concurrently. Serial if None
+    :param executor: "thread" or "process" (candidates must be picklable)
     :return: Function for density (kg/m^2) profile with respect to perpendicular
         distance (m) to flight path, swath width (m), and scale factor
     """
-    density_functions = _get_density_functions_array()
+    if density_functions is None:
+        density_functions = _get_density_functions_array()
     return _select_best_density_function_from_array(
         distance,
         density,
@@ -67,4 +127,6 @@ def get_best_density_function(
         swath_width,
         density_functions,
         flow_rate_function,
+        n_workers,
+        executor,
     )
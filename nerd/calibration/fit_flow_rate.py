@@ -12,3 +12,16 @@ def fit_flow_rate(aperture_diameters: np.ndarray, flow_rates: np.ndarray) -> Cal
     """
     coeficients = np.polyfit(aperture_diameters, flow_rates, 2)
     return np.poly1d(coeficients)
+
+
+def fit_flow_rate_covariance(aperture_diameters: np.ndarray, flow_rates: np.ndarray) -> np.ndarray:
+    """
+    Covariance matrix of the coefficients of the quadratic flow rate model
+    :param aperture_diameters: Array of diameters of the bucket aperture in
+        millimetres (mm)
+    :param flow_rates: Array of mass flow rate of bait in kg per second (kg/s)
+    :return: 3x3 covariance matrix of the coefficients, highest power first (as
+        in fit_flow_rate)
+    """
+    _, covariance = np.polyfit(aperture_diameters, flow_rates, 2, cov=True)
+    return covariance
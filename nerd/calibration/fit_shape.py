@@ -0,0 +1,104 @@
+from functools import partial
+from math import erf, sqrt
+from typing import Callable, Optional, Tuple, Union
+import numpy as np
+from nerd.density_functions import DensityFunction
+
+
+class _NormalWithSpread:
+    def __init__(self, standard_deviation: float):
+        self.standard_deviation = standard_deviation
+        self.__name__ = "normal"
+
+    def __call__(self, distance: np.ndarray, width: float, parameter: float) -> np.ndarray:
+        return (
+            parameter
+            / np.sqrt(2 * np.pi * self.standard_deviation**2)
+            * np.exp(-(distance**2) / (2 * self.standard_deviation**2))
+        )
+
+
+def _normal_unit_integral(
+    width: Union[float, np.ndarray], standard_deviation: float
+) -> Union[float, np.ndarray]:
+    from scipy.special import erf as vectorized_erf
+
+    return vectorized_erf(np.asarray(width) / (2 * sqrt(2) * standard_deviation))
+
+
+def fit_normal_spread(
+    distance: np.ndarray,
+    density: np.ndarray,
+    aperture_diameter_data: float,
+    helicopter_speed_data: float,
+    swath_width: float,
+    flow_rate_function: Callable,
+    starting_spread: Optional[float] = None,
+) -> Tuple[float, DensityFunction, float]:
+    """
+    Fit the standard deviation of a normal density profile to a measured profile.
+        The scale of the profile is not free: it conserves the mass delivered
+        over the swath, as in solver
+    :param distance: Perpendicular distance in meters (m) from flight path
+    :param density: Density of bait in kilograms per square meter (kg/m^2)
+    :param aperture_diameter_data: Diameter (mm) of the dispersion bucket
+        aperture
+    :param helicopter_speed_data: Speed (m/s) of the helicopter during
+        dispersion of bait
+    :param swath_width: Width (m) of dispersion swath
+    :param flow_rate_function: Function of mass flow rate (kg/s) with respect to
+        aperture diameter (mm)
+    :param starting_spread: Initial standard deviation (m); defaults to
+        swath_width / 4, the spread of density_functions.normal
+    :return: Standard deviation (m), the fitted profile as a DensityFunction
+        usable with solver, solve_batch and calibration.model, and the RMSE of
+        the fit
+    """
+    distance = np.asarray(distance, dtype=float)
+    density = np.asarray(density, dtype=float)
+    mass_per_meter = flow_rate_function(aperture_diameter_data) / helicopter_speed_data
+    half_width = swath_width / (2 * sqrt(2))
+    if starting_spread is None:
+        starting_spread = swath_width / 4
+
+    def estimate_density(standard_deviation: float) -> Tuple[np.ndarray, np.ndarray]:
+        scale = mass_per_meter / erf(half_width / standard_deviation)
+        kernel = np.exp(-(distance**2) / (2 * standard_deviation**2)) / (
+            sqrt(2 * np.pi) * standard_deviation
+        )
+        return scale, kernel
+
+    def residuals(spread: np.ndarray) -> np.ndarray:
+        scale, kernel = estimate_density(spread[0])
+        return scale * kernel - density
+
+    def jacobian(spread: np.ndarray) -> np.ndarray:
+        standard_deviation = spread[0]
+        scale, kernel = estimate_density(standard_deviation)
+        erf_value = erf(half_width / standard_deviation)
+        d_scale = (
+            mass_per_meter
+            * 2
+            / sqrt(np.pi)
+            * np.exp(-((half_width / standard_deviation) ** 2))
+            * half_width
+            / standard_deviation**2
+            / erf_value**2
+        )
+        d_kernel = kernel * (distance**2 / standard_deviation**3 - 1 / standard_deviation)
+        return (d_scale * kernel + scale * d_kernel)[:, np.newaxis]
+
+    from scipy.optimize import least_squares
+
+    solution = least_squares(
+        residuals, [starting_spread], jac=jacobian, bounds=([np.finfo(float).eps], [np.inf])
+    )
+    standard_deviation = float(solution.x[0])
+    density_function = DensityFunction(
+        _NormalWithSpread(standard_deviation),
+        unit_integral=partial(_normal_unit_integral, standard_deviation=standard_deviation),
+        name="normal",
+        linear=True,
+    )
+    rmse = float(np.sqrt(np.mean(solution.fun**2)))
+    return standard_deviation, density_function, rmse
@@ -0,0 +1,205 @@
+from typing import Hashable, Optional, Union
+import numpy as np
+import pandas as pd
+
+
+class FlowRateModel:
+    """
+    Polynomial models for flow rate (kg/s) as a function of aperture diameter (mm), one per group
+    of calibration data (e.g. bucket or bait batch).
+
+    Every group is fitted in one stacked least-squares problem, and the coefficients are stored
+    as arrays, so any group is evaluated by indexing the coefficient table and the model pickles
+    as a handful of small arrays.
+
+    Attributes:
+    -----------
+    groups : np.ndarray
+        Sorted labels of the groups.
+    coefficients : np.ndarray
+        Coefficients of each group, one row per group, highest power first (as np.polyfit).
+    covariances : np.ndarray
+        Covariance matrix of the coefficients of each group, with shape
+        (n_groups, degree + 1, degree + 1).
+    residual_standard_deviation : np.ndarray
+        Standard deviation (kg/s) of the residuals of each group, with degree + 1 degrees of
+        freedom removed.
+    n_observations : np.ndarray
+        Number of calibration measurements of each group.
+    default_group : label or None
+        Group evaluated when no group is given.
+    """
+
+    def __init__(
+        self,
+        groups: np.ndarray,
+        coefficients: np.ndarray,
+        covariances: np.ndarray,
+        residual_standard_deviation: np.ndarray,
+        n_observations: np.ndarray,
+        default_group: Optional[Hashable] = None,
+    ):
+        self.groups = np.asarray(groups)
+        self.coefficients = np.asarray(coefficients, dtype=float)
+        self.covariances = np.asarray(covariances, dtype=float)
+        self.residual_standard_deviation = np.asarray(residual_standard_deviation, dtype=float)
+        self.n_observations = np.asarray(n_observations)
+        if default_group is None and len(self.groups) == 1:
+            default_group = self.groups[0]
+        self.default_group = default_group
+
+    @classmethod
+    def fit(
+        cls,
+        aperture_diameters: np.ndarray,
+        flow_rates: np.ndarray,
+        groups: Optional[np.ndarray] = None,
+        degree: int = 2,
+        default_group: Optional[Hashable] = None,
+    ) -> "FlowRateModel":
+        """
+        Fit one polynomial per group in a single least-squares call
+        :param aperture_diameters: Array of diameters of the bucket aperture in
+            millimetres (mm)
+        :param flow_rates: Array of mass flow rate of bait in kg per second (kg/s)
+        :param groups: Group label of each measurement (e.g. `bait_status`). All
+            measurements belong to one group if None
+        :param degree: Degree of the polynomials
+        :param default_group: Group evaluated when no group is given
+        :return: FlowRateModel
+        """
+        aperture_diameters = np.asarray(aperture_diameters, dtype=float)
+        flow_rates = np.asarray(flow_rates, dtype=float)
+        if groups is None:
+            groups = np.zeros(len(aperture_diameters), dtype=int)
+        group_labels, group_index = np.unique(np.asarray(groups), return_inverse=True)
+        n_groups = len(group_labels)
+        n_coefficients = degree + 1
+        n_observations = np.bincount(group_index, minlength=n_groups)
+        if (n_observations <= n_coefficients).any():
+            raise ValueError("Every group needs more than {} measurements".format(n_coefficients))
+        vandermonde = np.vander(aperture_diameters, n_coefficients)
+        # Block diagonal design: the columns of each group are zero outside its rows
+        design = np.zeros((len(aperture_diameters), n_groups, n_coefficients))
+        design[np.arange(len(aperture_diameters)), group_index] = vandermonde
+        design = design.reshape(len(aperture_diameters), n_groups * n_coefficients)
+        # Columns are scaled to unit norm to keep the problem well conditioned, as np.polyfit does
+        scale = np.sqrt((design**2).sum(axis=0))
+        scaled_coefficients = np.linalg.lstsq(design / scale, flow_rates, rcond=None)[0]
+        coefficients = (scaled_coefficients / scale).reshape(n_groups, n_coefficients)
+        residuals = flow_rates - np.einsum("ij,ij->i", vandermonde, coefficients[group_index])
+        residual_variance = np.bincount(group_index, weights=residuals**2) / (
+            n_observations - n_coefficients
+        )
+        gram = np.zeros((n_groups, n_coefficients, n_coefficients))
+        np.add.at(gram, group_index, vandermonde[:, :, np.newaxis] * vandermonde[:, np.newaxis, :])
+        covariances = np.linalg.inv(gram) * residual_variance[:, np.newaxis, np.newaxis]
+        return cls(
+            group_labels,
+            coefficients,
+            covariances,
+            np.sqrt(residual_variance),
+            n_observations,
+            default_group,
+        )
+
+    @classmethod
+    def from_dataframe(
+        cls,
+        data: pd.DataFrame,
+        group_column: Optional[str] = None,
+        aperture_column: str = "aperture",
+        flow_column: str = "flow",
+        degree: int = 2,
+        default_group: Optional[Hashable] = None,
+    ) -> "FlowRateModel":
+        """
+        Fit the model from a table of calibration measurements
+        :param data: Table with aperture diameters (mm), flow rates (kg/s) and
+            optionally a group label per row (e.g. tests/data/flow.csv)
+        :param group_column: Column with the group labels (e.g. "bait_status").
+            One group if None
+        :param aperture_column: Column with the aperture diameters (mm)
+        :param flow_column: Column with the flow rates (kg/s)
+        :param degree: Degree of the polynomials
+        :param default_group: Group evaluated when no group is given
+        :return: FlowRateModel
+        """
+        groups = None if group_column is None else data[group_column].to_numpy()
+        return cls.fit(
+            data[aperture_column].to_numpy(),
+            data[flow_column].to_numpy(),
+            groups,
+            degree,
+            default_group,
+        )
+
+    @property
+    def degree(self) -> int:
+        return self.coefficients.shape[1] - 1
+
+    def __call__(
+        self,
+        aperture_diameter: Union[float, np.ndarray],
+        group: Union[Hashable, np.ndarray, None] = None,
+    ) -> np.ndarray:
+        return self.evaluate(aperture_diameter, group)
+
+    def __repr__(self) -> str:
+        return "FlowRateModel(groups={})".format(list(self.groups))
+
+    def evaluate(
+        self,
+        aperture_diameter: Union[float, np.ndarray],
+        group: Union[Hashable, np.ndarray, None] = None,
+    ) -> np.ndarray:
+        """
+        Flow rate for arrays of aperture diameters and group labels
+        :param aperture_diameter: Diameters (mm) of the dispersion bucket aperture
+        :param group: Group label, or array of labels broadcast against
+            aperture_diameter. Uses default_group if None
+        :return: Mass flow rate (kg/s) with the broadcast shape of the inputs
+        """
+        coefficients = self.coefficients[self.group_index(group)]
+        aperture_diameter = np.asarray(aperture_diameter, dtype=float)
+        flow_rate = np.zeros(np.broadcast_shapes(aperture_diameter.shape, coefficients.shape[:-1]))
+        for power in range(self.degree + 1):
+            flow_rate = flow_rate * aperture_diameter + coefficients[..., power]
+        return flow_rate
+
+    def group_index(self, group: Union[Hashable, np.ndarray, None] = None) -> np.ndarray:
+        """
+        :param group: Group label or array of labels. Uses default_group if None
+        :return: Row of each label in the coefficient table
+        """
+        if group is None:
+            if self.default_group is None:
+                raise ValueError(
+                    "The model has several groups; choose one of {}".format(list(self.groups))
+                )
+            group = self.default_group
+        group = np.asarray(group)
+        index = np.minimum(np.searchsorted(self.groups, group), len(self.groups) - 1)
+        found = np.asarray(self.groups[index] == group)
+        if not found.all():
+            raise ValueError(
+                "Unknown flow rate groups {}. Fitted groups: {}".format(
+                    list(np.unique(group[~found] if group.ndim else group)), list(self.groups)
+                )
+            )
+        return index
+
+    def poly1d(self, group: Optional[Hashable] = None) -> np.poly1d:
+        """
+        :param group: Group label. Uses default_group if None
+        :return: Flow rate function of one group, as returned by fit_flow_rate
+        """
+        return np.poly1d(self.coefficients[int(self.group_index(group))])
+
+    def covariance(self, group: Optional[Hashable] = None) -> np.ndarray:
+        """
+        :param group: Group label. Uses default_group if None
+        :return: Covariance matrix of the coefficients of one group, as returned
+            by fit_flow_rate_covariance
+        """
+        return self.covariances[int(self.group_index(group))]
@@ -1,6 +1,6 @@
-from typing import Callable
+from typing import Callable, Optional
 import numpy as np
-from nerd import solver
+from nerd import solve_batch, evaluate_profiles, SolverCache
 
 
 def model(
@@ -9,6 +9,8 @@ def model(
     swath_width: float,
     density_function: Callable,
     flow_rate_function: Callable,
+    cache: Optional[SolverCache] = None,
+    n_workers: Optional[int] = None,
 ) -> np.ndarray:
     """
     Calculate the density matrix directly below the helicopter (nadir) as a
@@ -22,16 +24,27 @@ def model(
         factor
     :param flow_rate_function: Function of mass flow rate (kg/s) with respect to
         aperture diameter (mm)
+    :param cache: Optional SolverCache shared between calls
+    :param n_workers: Number of worker processes for density functions that have
+        to be solved numerically (see nerd.solve_batch)
     :return: Density matrix directly below the helicopter (nadir) as a function
         of aperture_diameter and helicopter_speed
     """
     distance = 0
     assert distance == 0
-    densidad = np.zeros([len(helicopter_speed), len(aperture_diameter)])
-    for i_diametro, diametro in enumerate(aperture_diameter):
-        for i_rapidez, rapidez in enumerate(helicopter_speed):
-            get_density = solver(
-                diametro, rapidez, swath_width, density_function, flow_rate_function
-            )
-            densidad[i_rapidez][i_diametro] = get_density(distance)
+    diametros, rapideces = np.meshgrid(aperture_diameter, helicopter_speed)
+    if cache is None:
+        parametros = solve_batch(
+            diametros, rapideces, swath_width, density_function, flow_rate_function, n_workers
+        )
+    else:
+        parametros = np.array(
+            [
+                cache.fit_parameter(
+                    diametro, rapidez, swath_width, density_function, flow_rate_function
+                )
+                for diametro, rapidez in zip(np.ravel(diametros), np.ravel(rapideces))
+            ]
+        ).reshape(diametros.shape)
+    densidad = evaluate_profiles(distance, swath_width, parametros, density_function)
     return np.array(densidad)
@@ -1,6 +1,12 @@
-from typing import Callable
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Optional
 import numpy as np
-from nerd import solver
+from nerd import solver, SolverCache
+from nerd.density_functions import as_density_function
+from nerd.solver import _fit_parameter_from_mass
+
+_executors = {"thread": ThreadPoolExecutor, "process": ProcessPoolExecutor}
 
 
 def _get_rmse_from_function_array(
@@ -11,20 +17,57 @@ def _get_rmse_from_function_array(
     swath_width: float,
     density_functions_array: list,
     flow_rate_function: Callable,
+    cache: Optional[SolverCache] = None,
+    n_workers: Optional[int] = None,
+    executor: str = "thread",
 ) -> np.ndarray:
-    rmse = []
-    for funcion_densidad in density_functions_array:
-        rmse_auxiliar = _get_rmse(
-            distance,
-            density,
-            aperture_diameter,
-            helicopter_speed,
-            swath_width,
-            funcion_densidad,
-            flow_rate_function,
+    if executor not in _executors:
+        raise ValueError(
+            "executor must be one of {}, not '{}'".format(", ".join(_executors), executor)
+        )
+    if cache is not None:
+        return np.array(
+            [
+                _get_rmse(
+                    distance,
+                    density,
+                    aperture_diameter,
+                    helicopter_speed,
+                    swath_width,
+                    funcion_densidad,
+                    flow_rate_function,
+                    cache,
+                )
+                for funcion_densidad in density_functions_array
+            ]
+        )
+    get_rmse = partial(
+        _get_rmse_from_mass,
+        distance=np.asarray(distance, dtype=float),
+        density=np.asarray(density, dtype=float),
+        mass_per_meter=flow_rate_function(aperture_diameter) / helicopter_speed,
+        swath_width=swath_width,
+    )
+    if n_workers is None or n_workers < 2:
+        return np.array(
+            [get_rmse(funcion_densidad) for funcion_densidad in density_functions_array]
         )
-        rmse.append(rmse_auxiliar)
-    return np.array(rmse)
+    with _executors[executor](max_workers=n_workers) as pool:
+        return np.array(list(pool.map(get_rmse, density_functions_array)))
+
+
+def _get_rmse_from_mass(
+    density_function: Callable,
+    distance: np.ndarray,
+    density: np.ndarray,
+    mass_per_meter: float,
+    swath_width: float,
+) -> float:
+    parameter = _fit_parameter_from_mass(mass_per_meter, swath_width, density_function)
+    estimated_density = as_density_function(density_function).evaluate(
+        distance, swath_width, parameter
+    )
+    return np.sqrt(np.mean((estimated_density - density) ** 2))
 
 
 def _get_rmse(
@@ -35,9 +78,15 @@ def _get_rmse(
     swath_width: float,
     density_function: Callable,
     flow_rate_function: Callable,
+    cache: Optional[SolverCache] = None,
 ) -> float:
     density_profile_function = solver(
-        aperture_diameter, helicopter_speed, swath_width, density_function, flow_rate_function
+        aperture_diameter,
+        helicopter_speed,
+        swath_width,
+        density_function,
+        flow_rate_function,
+        cache,
     )
     estimated_density = density_profile_function(distance)
     rmse = np.sqrt(np.mean((estimated_density - density) ** 2))
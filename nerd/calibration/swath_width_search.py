@@ -0,0 +1,81 @@
+from typing import Callable, Optional, Tuple
+import numpy as np
+import pandas as pd
+from nerd import solve_batch, evaluate_profiles
+from nerd.calibration.best_density_function import _get_density_functions_array
+from nerd.calibration.get_swath_width import get_swath_width
+from nerd.density_functions import as_density_function
+
+
+def fit_swath_width_and_density_function(
+    distance: np.ndarray,
+    density: np.ndarray,
+    aperture_diameter_data: float,
+    helicopter_speed_data: float,
+    flow_rate_function: Callable,
+    swath_widths: Optional[np.ndarray] = None,
+    density_functions: Optional[list] = None,
+) -> Tuple[float, Callable, pd.DataFrame]:
+    """
+    Select the swath width and density function with minimum RMSE over a grid of
+        candidate swath widths and density functions
+    :param distance: Perpendicular distance in meters (m) from flight path
+    :param density: Density of bait in kilograms per square meter (kg/m^2)
+    :param aperture_diameter_data: Diameter (mm) of the dispersion bucket
+        aperture
+    :param helicopter_speed_data: Speed (m/s) of the helicopter during
+        dispersion of bait
+    :param flow_rate_function: Function of mass flow rate (kg/s) with respect to
+        aperture diameter (mm)
+    :param swath_widths: Candidate swath widths (m). Defaults to 101 widths
+        between half and one and a half times the width from get_swath_width
+    :param density_functions: Candidate density functions (defaults to the
+        functions registered in submodule nerd.density_functions)
+    :return: Swath width (m), density function, and RMSE surface with one row
+        per swath width and one column per density function
+    """
+    distance = np.asarray(distance, dtype=float)
+    density = np.asarray(density, dtype=float)
+    if swath_widths is None:
+        swath_width = get_swath_width(distance, density)
+        swath_widths = np.linspace(swath_width / 2, 3 * swath_width / 2, 101)
+    swath_widths = np.asarray(swath_widths, dtype=float)
+    if density_functions is None:
+        density_functions = _get_density_functions_array()
+    rmse = np.array(
+        [
+            _get_rmse_by_swath_width(
+                distance,
+                density,
+                aperture_diameter_data,
+                helicopter_speed_data,
+                swath_widths,
+                density_function,
+                flow_rate_function,
+            )
+            for density_function in density_functions
+        ]
+    )
+    i_function, i_width = np.unravel_index(np.argmin(rmse), rmse.shape)
+    rmse_surface = pd.DataFrame(
+        rmse.T,
+        index=pd.Index(swath_widths, name="swath_width"),
+        columns=[as_density_function(f).name for f in density_functions],
+    )
+    return swath_widths[i_width], density_functions[i_function], rmse_surface
+
+
+def _get_rmse_by_swath_width(
+    distance: np.ndarray,
+    density: np.ndarray,
+    aperture_diameter: float,
+    helicopter_speed: float,
+    swath_widths: np.ndarray,
+    density_function: Callable,
+    flow_rate_function: Callable,
+) -> np.ndarray:
+    parameters = solve_batch(
+        aperture_diameter, helicopter_speed, swath_widths, density_function, flow_rate_function
+    )
+    estimated_density = evaluate_profiles(distance, swath_widths, parameters, density_function)
+    return np.sqrt(np.mean((estimated_density - density) ** 2, axis=-1))
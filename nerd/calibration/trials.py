@@ -0,0 +1,136 @@
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Callable, Optional
+import numpy as np
+import pandas as pd
+from nerd.calibration.fit_shape import fit_normal_spread
+from nerd.calibration.best_density_function import (
+    _get_density_functions_array,
+    get_density_functions_rmse,
+)
+from nerd.calibration.get_swath_width import get_swath_width
+from nerd.calibration.swath_width_search import fit_swath_width_and_density_function
+
+trial_columns = ["trial", "distance", "density", "aperture_diameter", "helicopter_speed"]
+calibration_columns = [
+    "trial",
+    "aperture_diameter",
+    "helicopter_speed",
+    "swath_width",
+    "density_function",
+    "rmse",
+]
+spread_columns = ["normal_spread", "normal_spread_rmse"]
+
+
+def calibrate_trials(
+    trials: pd.DataFrame,
+    flow_rate_function: Callable,
+    density_functions: Optional[list] = None,
+    swath_widths: Optional[np.ndarray] = None,
+    alpha: float = 0.05,
+    n_workers: Optional[int] = None,
+    fit_spread: bool = False,
+) -> pd.DataFrame:
+    """
+    Fit swath width, best density function and its RMSE for many calibration
+        trials
+    :param trials: Table with one row per measurement and the columns `trial`,
+        `distance` (m), `density` (kg/m^2), `aperture_diameter` (mm) and
+        `helicopter_speed` (m/s). Aperture and speed must be constant within a
+        trial
+    :param flow_rate_function: Function of mass flow rate (kg/s) with respect to
+        aperture diameter (mm)
+    :param density_functions: Candidate density functions (defaults to the
+        functions registered in submodule nerd.density_functions)
+    :param swath_widths: Candidate swath widths (m). If given, the swath width is
+        searched jointly with the density function; otherwise it comes from
+        get_swath_width
+    :param alpha: Proportion of discarded data points used by get_swath_width
+    :param n_workers: Number of worker processes; trials are calibrated
+        serially if None
+    :param fit_spread: Also fit the standard deviation of a normal profile with
+        fit_normal_spread at the calibrated swath width
+    :return: Table with one row per trial (sorted by trial) and the columns
+        `trial`, `aperture_diameter`, `helicopter_speed`, `swath_width`,
+        `density_function` and `rmse`, plus `normal_spread` (m) and
+        `normal_spread_rmse` if fit_spread
+    """
+    missing_columns = [column for column in trial_columns if column not in trials.columns]
+    if missing_columns:
+        raise ValueError("Missing columns in trials table: {}".format(", ".join(missing_columns)))
+    if density_functions is None:
+        density_functions = _get_density_functions_array()
+    calibrate = partial(
+        _calibrate_trial,
+        flow_rate_function=flow_rate_function,
+        density_functions=density_functions,
+        swath_widths=swath_widths,
+        alpha=alpha,
+        fit_spread=fit_spread,
+    )
+    trial_tables = [trial for _, trial in trials.groupby("trial", sort=True)]
+    if n_workers is None or n_workers < 2:
+        results = [calibrate(trial) for trial in trial_tables]
+    else:
+        chunksize = max(1, len(trial_tables) // (4 * n_workers))
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            results = list(executor.map(calibrate, trial_tables, chunksize=chunksize))
+    columns = calibration_columns + spread_columns if fit_spread else calibration_columns
+    return pd.DataFrame(results, columns=columns)
+
+
+def _calibrate_trial(
+    trial: pd.DataFrame,
+    flow_rate_function: Callable,
+    density_functions: list,
+    swath_widths: Optional[np.ndarray],
+    alpha: float,
+    fit_spread: bool = False,
+) -> dict:
+    for column in ["aperture_diameter", "helicopter_speed"]:
+        if trial[column].nunique() != 1:
+            raise ValueError("Trial {} has more than one {}".format(trial["trial"].iloc[0], column))
+    distance = trial["distance"].to_numpy(dtype=float)
+    density = trial["density"].to_numpy(dtype=float)
+    aperture_diameter = trial["aperture_diameter"].iloc[0]
+    helicopter_speed = trial["helicopter_speed"].iloc[0]
+    if swath_widths is None:
+        swath_width = get_swath_width(distance, density, alpha)
+        rmse = get_density_functions_rmse(
+            distance,
+            density,
+            aperture_diameter,
+            helicopter_speed,
+            swath_width,
+            flow_rate_function,
+            density_functions,
+        )
+        i_best = int(np.argmin(rmse["rmse"].to_numpy()))
+        density_function = rmse["density_function"].iloc[i_best]
+        best_rmse = rmse["rmse"].iloc[i_best]
+    else:
+        swath_width, function, rmse_surface = fit_swath_width_and_density_function(
+            distance,
+            density,
+            aperture_diameter,
+            helicopter_speed,
+            flow_rate_function,
+            swath_widths,
+            density_functions,
+        )
+        density_function = rmse_surface.columns[density_functions.index(function)]
+        best_rmse = rmse_surface.min().min()
+    result = {
+        "trial": trial["trial"].iloc[0],
+        "aperture_diameter": aperture_diameter,
+        "helicopter_speed": helicopter_speed,
+        "swath_width": swath_width,
+        "density_function": density_function,
+        "rmse": best_rmse,
+    }
+    if fit_spread:
+        result["normal_spread"], _, result["normal_spread_rmse"] = fit_normal_spread(
+            distance, density, aperture_diameter, helicopter_speed, swath_width, flow_rate_function
+        )
+    return result
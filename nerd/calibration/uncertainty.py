@@ -0,0 +1,211 @@
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Callable, Optional, Sequence
+import numpy as np
+from nerd import evaluate_profiles
+from nerd.solver import _solve_batch_from_mass
+
+
+def sample_flow_rate_coefficients(
+    coefficients: np.ndarray,
+    covariance: np.ndarray,
+    n_draws: int,
+    seed: Optional[int] = None,
+) -> np.ndarray:
+    """
+    Draw coefficients of the flow rate model from their sampling distribution
+    :param coefficients: Coefficients of the flow rate model, highest power
+        first (e.g. fit_flow_rate(...).coeffs)
+    :param covariance: Covariance matrix of the coefficients (see
+        fit_flow_rate_covariance)
+    :param n_draws: Number of draws
+    :param seed: Seed of the random number generator
+    :return: Array of coefficients with one row per draw
+    """
+    rng = np.random.default_rng(seed)
+    return rng.multivariate_normal(coefficients, covariance, size=n_draws)
+
+
+def model_percentiles(
+    aperture_diameter: np.ndarray,
+    helicopter_speed: np.ndarray,
+    swath_width: float,
+    density_function: Callable,
+    flow_rate_coefficients: np.ndarray,
+    flow_rate_covariance: np.ndarray,
+    swath_width_sd: float = 0.0,
+    percentiles: Sequence[float] = (2.5, 50, 97.5),
+    n_draws: int = 1000,
+    seed: Optional[int] = None,
+    n_workers: Optional[int] = None,
+    chunk_size: int = 250,
+) -> np.ndarray:
+    """
+    Monte Carlo percentiles of the density matrix directly below the helicopter
+        (nadir), propagating the uncertainty of the flow rate model and of the
+        swath width
+    :param aperture_diameter: Diameter (mm) of the dispersion bucket aperture
+    :param helicopter_speed: Speed (m/s) of the helicopter during dispersion of
+        bait
+    :param swath_width: Width (m) of dispersion swath
+    :param density_function: Function for density (kg/m^2) profile with respect
+        to perpendicular distance (m) to flight path, swath width (m), and scale
+        factor
+    :param flow_rate_coefficients: Coefficients of the flow rate model, highest
+        power first
+    :param flow_rate_covariance: Covariance matrix of the coefficients
+    :param swath_width_sd: Standard deviation (m) of the swath width; widths are
+        drawn from a normal distribution truncated at zero
+    :param percentiles: Percentiles (0-100) to compute
+    :param n_draws: Number of Monte Carlo draws
+    :param seed: Seed of the random number generator
+    :param n_workers: Number of worker processes; draws are evaluated in the
+        main process if None
+    :param chunk_size: Number of draws evaluated per chunk
+    :return: Array with shape (len(percentiles), len(helicopter_speed),
+        len(aperture_diameter)), each slice laid out as calibration.model
+    """
+    rng = np.random.default_rng(seed)
+    coefficients = rng.multivariate_normal(
+        flow_rate_coefficients, flow_rate_covariance, size=n_draws
+    )
+    swath_widths = _sample_positive_normal(rng, swath_width, swath_width_sd, n_draws)
+    chunks = [
+        (coefficients[start : start + chunk_size], swath_widths[start : start + chunk_size])
+        for start in range(0, n_draws, chunk_size)
+    ]
+    nadir_densities = partial(
+        _nadir_densities,
+        aperture_diameter=np.asarray(aperture_diameter, dtype=float),
+        helicopter_speed=np.asarray(helicopter_speed, dtype=float),
+        density_function=density_function,
+    )
+    densities = np.concatenate(_map_chunks(nadir_densities, chunks, n_workers))
+    return np.percentile(densities, percentiles, axis=0)
+
+
+def density_map_percentiles(
+    unit_flow_densities: np.ndarray,
+    aperture_diameters: np.ndarray,
+    flow_rate_coefficients: np.ndarray,
+    flow_rate_covariance: np.ndarray,
+    percentiles: Sequence[float] = (2.5, 50, 97.5),
+    n_draws: int = 1000,
+    seed: Optional[int] = None,
+    n_workers: Optional[int] = None,
+    chunk_size: int = 100_000,
+    grouped_by_width: bool = False,
+) -> np.ndarray:
+    """
+    Monte Carlo percentiles of a bait density map, propagating the uncertainty
+        of the flow rate model and, with maps grouped by width, of the swath
+        width. The map is linear in the flow rate of each aperture, so every
+        draw is a weighted sum of unit flow maps
+    :param unit_flow_densities: Density maps obtained with a flow rate of 1 kg/s
+        for each aperture and 0 for the rest, stacked along the first axis. With
+        grouped_by_width, these stacks are stacked again along a leading axis
+        of swath width groups
+    :param aperture_diameters: Aperture diameter (mm) of each unit flow map
+    :param flow_rate_coefficients: Coefficients of the flow rate model, highest
+        power first
+    :param flow_rate_covariance: Covariance matrix of the coefficients
+    :param percentiles: Percentiles (0-100) to compute
+    :param n_draws: Number of Monte Carlo draws
+    :param seed: Seed of the random number generator
+    :param n_workers: Number of worker processes; grid cells are evaluated in
+        the main process if None
+    :param chunk_size: Number of grid cells evaluated per chunk
+    :param grouped_by_width: Whether unit_flow_densities has a leading axis of
+        swath width groups of equal probability (e.g. the quantiles of
+        swath_width_offsets). The draws are spread evenly over the groups
+    :return: Array with shape (len(percentiles),) + shape of one map
+    """
+    coefficients = sample_flow_rate_coefficients(
+        flow_rate_coefficients, flow_rate_covariance, n_draws, seed
+    )
+    flow_rates = _evaluate_polynomials(coefficients, np.asarray(aperture_diameters, dtype=float))
+    if not grouped_by_width:
+        unit_flow_densities = unit_flow_densities[np.newaxis]
+    n_groups, n_apertures = unit_flow_densities.shape[:2]
+    map_shape = unit_flow_densities.shape[2:]
+    cells = unit_flow_densities.reshape(n_groups, n_apertures, -1)
+    chunks = [
+        cells[..., start : start + chunk_size] for start in range(0, cells.shape[-1], chunk_size)
+    ]
+    # Stratified over the groups: draw i uses the maps of group i mod n_groups
+    cell_percentiles = partial(
+        _cell_percentiles,
+        flow_rates=flow_rates,
+        groups=np.arange(n_draws) % n_groups,
+        percentiles=percentiles,
+    )
+    density_percentiles = np.concatenate(_map_chunks(cell_percentiles, chunks, n_workers), axis=1)
+    return density_percentiles.reshape((len(percentiles),) + map_shape)
+
+
+def swath_width_offsets(
+    swath_width_sd: float, n_groups: int, smallest_swath_width: float
+) -> np.ndarray:
+    """
+    Offsets (m) to add to the swath widths of a map, one per group of equal
+        probability, for density_map_percentiles with grouped_by_width. Each is
+        the median of its group under a normal distribution of the offset,
+        truncated so that the smallest swath width stays positive
+    :param swath_width_sd: Standard deviation (m) of the swath width
+    :param n_groups: Number of groups
+    :param smallest_swath_width: Smallest swath width (m) of the map
+    :return: Increasing array of n_groups offsets (m)
+    """
+    from scipy.special import ndtr, ndtri
+
+    lowest_probability = ndtr(-smallest_swath_width / swath_width_sd)
+    probabilities = (np.arange(n_groups) + 0.5) / n_groups
+    return swath_width_sd * ndtri(lowest_probability + probabilities * (1 - lowest_probability))
+
+
+def _map_chunks(function: Callable, chunks: list, n_workers: Optional[int]) -> list:
+    if n_workers is None or n_workers < 2 or len(chunks) < 2:
+        return [function(chunk) for chunk in chunks]
+    with ProcessPoolExecutor(max_workers=n_workers) as executor:
+        return list(executor.map(function, chunks))
+
+
+def _nadir_densities(
+    chunk: tuple,
+    aperture_diameter: np.ndarray,
+    helicopter_speed: np.ndarray,
+    density_function: Callable,
+) -> np.ndarray:
+    coefficients, swath_widths = chunk
+    flow_rates = _evaluate_polynomials(coefficients, aperture_diameter)
+    mass_per_meter = flow_rates[:, np.newaxis, :] / helicopter_speed[np.newaxis, :, np.newaxis]
+    swath_widths = np.broadcast_to(swath_widths[:, np.newaxis, np.newaxis], mass_per_meter.shape)
+    parameters = _solve_batch_from_mass(mass_per_meter, swath_widths, density_function)
+    return evaluate_profiles(0.0, swath_widths, parameters, density_function)
+
+
+def _cell_percentiles(
+    cells: np.ndarray, flow_rates: np.ndarray, groups: np.ndarray, percentiles: Sequence[float]
+) -> np.ndarray:
+    densities = np.empty((len(flow_rates), cells.shape[-1]))
+    for group, group_cells in enumerate(cells):
+        densities[groups == group] = flow_rates[groups == group] @ group_cells
+    return np.percentile(densities, percentiles, axis=0)
+
+
+def _evaluate_polynomials(coefficients: np.ndarray, x: np.ndarray) -> np.ndarray:
+    values = np.zeros((len(coefficients), len(x)))
+    for coefficient in coefficients.T:
+        values = values * x + coefficient[:, np.newaxis]
+    return values
+
+
+def _sample_positive_normal(
+    rng: np.random.Generator, mean: float, standard_deviation: float, n_draws: int
+) -> np.ndarray:
+    samples = rng.normal(mean, standard_deviation, n_draws)
+    is_not_positive = samples <= 0
+    while is_not_positive.any():
+        samples[is_not_positive] = rng.normal(mean, standard_deviation, is_not_positive.sum())
+        is_not_positive = samples <= 0
+    return samples
@@ -1 +1,8 @@
 from nerd.density_functions.density_functions import uniform, triangular, normal  # noqa
+from nerd.density_functions.registry import (  # noqa
+    DensityFunction,
+    register_density_function,
+    get_density_function,
+    as_density_function,
+    registered_density_functions,
+)
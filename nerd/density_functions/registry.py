@@ -0,0 +1,288 @@
+from collections import OrderedDict
+from math import erf, sqrt
+from typing import Callable, Dict, Optional, Union
+import warnings
+import numpy as np
+from nerd.density_functions.density_functions import uniform, triangular, normal
+
+ENTRY_POINT_GROUP = "nerd.density_functions"
+# Unit-parameter profiles kept per DensityFunction, least recently used first out
+_MAX_UNIT_PROFILES = 64
+# DensityFunction objects kept for unregistered functions, least recently used first out
+_MAX_UNREGISTERED = 32
+
+
+class DensityFunction:
+    """
+    Density profile together with the metadata shared by the solver, the calibration and the
+    tiling.
+
+    Attributes:
+    -----------
+    function : Callable
+        Function for density (kg/m^2) profile with respect to perpendicular distance (m) to flight
+        path, swath width (m), and free parameter.
+    name : str
+        Name used in the configuration file (`density_function` of each resource).
+    unit_integral : Callable or None
+        Integral over [-width/2, width/2] of the profile with free parameter equal to one, as a
+        function of swath width (m). None when it is not known in closed form.
+    support : Callable
+        Half width (m) of the region where the profile is not zero, as a function of swath width
+        (m). Profiles with unbounded support return np.inf.
+    linear : bool or None
+        Whether the profile scales linearly with its free parameter. None means unknown; it is
+        then detected from samples the first time it is needed.
+    parameter_derivative : Callable or None
+        Derivative of the profile with respect to its free parameter, with the arguments of
+        `function`. When given, the numeric solver passes its integral over the swath to the root
+        finder as the derivative of the mass conservation residual.
+    """
+
+    def __init__(
+        self,
+        function: Callable,
+        unit_integral: Optional[Callable] = None,
+        support: Optional[Callable] = None,
+        name: Optional[str] = None,
+        linear: Optional[bool] = None,
+        parameter_derivative: Optional[Callable] = None,
+    ):
+        self.function = function
+        self.name = function.__name__ if name is None else name
+        self.unit_integral = unit_integral
+        self.support = _unbounded_support if support is None else support
+        self.linear = linear
+        self.parameter_derivative = parameter_derivative
+        self._unit_integrals: Dict[float, float] = {}
+        self._unit_profiles: OrderedDict = OrderedDict()
+
+    def __call__(self, distance, width, parameter):
+        return self.function(distance, width, parameter)
+
+    def __repr__(self) -> str:
+        return "DensityFunction({})".format(self.name)
+
+    def evaluate(
+        self,
+        distance: np.ndarray,
+        width: Union[float, np.ndarray],
+        parameter: Union[float, np.ndarray],
+        out: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """
+        Evaluate the profile on arrays of distances, widths and parameters
+        :param distance: Perpendicular distance in meters (m) from flight path
+        :param width: Swath width (m)
+        :param parameter: Free parameter of the profile
+        :param out: Optional preallocated array where the density is written.
+            Profiles that are linear in their free parameter write into it
+            without temporaries, scaling their cached unit profile
+        :return: Density (kg/m^2) with the broadcast shape of the inputs (out
+            when given)
+        """
+        if out is None:
+            return np.asarray(self.function(distance, width, parameter), dtype=float)
+        if np.ndim(width) == 0 and self.is_linear(float(width)):
+            return np.multiply(self.unit_profile(distance, float(width)), parameter, out=out)
+        out[...] = self.function(distance, width, parameter)
+        return out
+
+    def is_linear(self, width: float) -> bool:
+        """
+        :param width: Swath width (m) used to sample the profile when linearity
+            has not been declared
+        :return: Whether the profile scales linearly with its free parameter
+        """
+        if self.linear is None:
+            self.linear = _is_linear_in_parameter(self.function, width)
+        return self.linear
+
+    def integrate_unit_profile(self, width: Union[float, np.ndarray]) -> Optional[np.ndarray]:
+        """
+        Integral over [-width/2, width/2] of the profile with free parameter one
+        :param width: Swath width (m), scalar or array
+        :return: Integral with the shape of width, or None when the profile is
+            not linear in its free parameter and has no declared integral
+        """
+        if self.unit_integral is not None:
+            return self.unit_integral(width)
+        widths = np.asarray(width, dtype=float)
+        if widths.size == 0 or not self.is_linear(widths.flat[0]):
+            return None
+        unique_widths, inverse = np.unique(widths, return_inverse=True)
+        integrals = np.array([self._integrate_unit_profile(width) for width in unique_widths])
+        return integrals[np.ravel(inverse)].reshape(widths.shape)
+
+    def unit_profile(self, distance: np.ndarray, width: float) -> np.ndarray:
+        """
+        Profile with free parameter one sampled on a distance grid. The last
+        _MAX_UNIT_PROFILES templates are cached per (width, grid), so the profile
+        of a linear density function for any parameter is a single multiplication.
+        :param distance: Perpendicular distance in meters (m) from flight path
+        :param width: Swath width (m)
+        :return: Read-only density (kg/m^2) array with the shape of distance
+        """
+        distance = np.asarray(distance, dtype=float)
+        key = (float(width), distance.tobytes())
+        if key in self._unit_profiles:
+            self._unit_profiles.move_to_end(key)
+            return self._unit_profiles[key]
+        profile = self.evaluate(distance, width, 1.0)
+        profile.setflags(write=False)
+        self._unit_profiles[key] = profile
+        if len(self._unit_profiles) > _MAX_UNIT_PROFILES:
+            self._unit_profiles.popitem(last=False)
+        return profile
+
+    def _integrate_unit_profile(self, width: float) -> float:
+        if width not in self._unit_integrals:
+            from scipy.integrate import quad
+
+            self._unit_integrals[width] = quad(
+                lambda distance: self.function(distance, width, 1.0), -width / 2, width / 2
+            )[0]
+        return self._unit_integrals[width]
+
+
+def _is_linear_in_parameter(function: Callable, width: float) -> bool:
+    distance = np.linspace(-width, width, 41)
+    try:
+        unit_profile = np.asarray(function(distance, width, 1.0), dtype=float)
+        tolerance = 1e-12 * np.max(np.abs(unit_profile), initial=0)
+        return all(
+            np.allclose(
+                function(distance, width, parameter),
+                parameter * unit_profile,
+                rtol=1e-9,
+                atol=tolerance,
+            )
+            for parameter in [0.0, 0.5, -2.0, 3.0]
+        )
+    except (TypeError, ValueError):
+        # Profiles written for scalar distances can not be sampled on arrays
+        return False
+
+
+def _unbounded_support(width: float) -> float:
+    return np.inf
+
+
+def _half_width(width: float) -> float:
+    return width / 2
+
+
+_registry: Dict[str, DensityFunction] = {}
+_registry_by_function: Dict[Callable, DensityFunction] = {}
+_unregistered: OrderedDict = OrderedDict()
+
+
+def register_density_function(
+    function: Union[Callable, DensityFunction],
+    unit_integral: Optional[Callable] = None,
+    support: Optional[Callable] = None,
+    name: Optional[str] = None,
+    linear: Optional[bool] = None,
+    parameter_derivative: Optional[Callable] = None,
+) -> DensityFunction:
+    """
+    Add a density profile to the registry used by nerd
+    :param function: Density function, or a DensityFunction already built
+    :param unit_integral: Integral of the profile with free parameter one as a
+        function of swath width (m), if known
+    :param support: Half width (m) of the profile support as a function of swath
+        width (m); unbounded if not given
+    :param name: Name of the profile in configuration files (defaults to the
+        function name)
+    :param linear: Whether the profile scales linearly with its free parameter
+        (detected from samples if not given)
+    :param parameter_derivative: Derivative of the profile with respect to its
+        free parameter, used by the numeric solver if given
+    :return: The registered DensityFunction
+    """
+    if isinstance(function, DensityFunction):
+        density_function = function
+    else:
+        density_function = DensityFunction(
+            function, unit_integral, support, name, linear, parameter_derivative
+        )
+    _registry[density_function.name] = density_function
+    _registry_by_function[density_function.function] = density_function
+    return density_function
+
+
+def get_density_function(name: str) -> DensityFunction:
+    """
+    Look up a registered density profile by name
+    :param name: Name of the profile (e.g. "normal")
+    :return: The registered DensityFunction
+    """
+    if name not in _registry:
+        raise ValueError(
+            "Unknown density function '{}'. Registered density functions: {}".format(
+                name, ", ".join(sorted(_registry))
+            )
+        )
+    return _registry[name]
+
+
+def as_density_function(function: Callable) -> DensityFunction:
+    """
+    :param function: Density function or DensityFunction
+    :return: The registered DensityFunction for the function, or an unregistered
+        one without declared integral
+    """
+    if isinstance(function, DensityFunction):
+        return function
+    if function in _registry_by_function:
+        return _registry_by_function[function]
+    # The last _MAX_UNREGISTERED unregistered functions keep their DensityFunction, so their
+    # caches are reused across calls
+    try:
+        density_function = _unregistered.get(function)
+    except TypeError:
+        # Unhashable callables get a new DensityFunction on every call
+        return DensityFunction(function)
+    if density_function is None:
+        density_function = DensityFunction(function)
+        _unregistered[function] = density_function
+        if len(_unregistered) > _MAX_UNREGISTERED:
+            _unregistered.popitem(last=False)
+    else:
+        _unregistered.move_to_end(function)
+    return density_function
+
+
+def registered_density_functions() -> list:
+    """
+    :return: Registered DensityFunction objects sorted by name
+    """
+    return [_registry[name] for name in sorted(_registry)]
+
+
+def _load_entry_points() -> None:
+    from importlib.metadata import entry_points
+
+    try:
+        plugins = entry_points(group=ENTRY_POINT_GROUP)
+    except TypeError:  # Python < 3.10
+        plugins = entry_points().get(ENTRY_POINT_GROUP, [])  # type: ignore
+    for plugin in plugins:
+        if plugin.name in _builtin_names:
+            warnings.warn(
+                "Density function {} of {} was not loaded: it has the name of a built-in "
+                "density function".format(plugin.name, plugin.value)
+            )
+            continue
+        try:
+            register_density_function(plugin.load(), name=plugin.name)
+        except Exception as error:
+            warnings.warn("Could not load density function {}: {}".format(plugin.name, error))
+
+
+register_density_function(uniform, lambda width: width, _half_width, linear=True)
+register_density_function(triangular, lambda width: width / 2, _half_width, linear=True)
+register_density_function(normal, lambda width: erf(sqrt(2)), linear=True)
+# Plugins cannot replace these
+_builtin_names = frozenset(_registry)
+_load_entry_points()
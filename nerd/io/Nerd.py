@@ -1,16 +1,17 @@
+from nerd.calibration.uncertainty import density_map_percentiles, swath_width_offsets
 from nerd.io.import_data import (
+    _import_calibration_covariance,
     _import_calibration_data,
-    _import_multifile_tracmap,
     _check_output_directory,
+    _read_config,
 )
-from nerd.mapping.tiling import (
-    _calculate_total_density,
-    _density_contours_intervals,
-    _generate_contours,
-)
-import geojsoncontour
+from nerd.io.track_cache import TrackCache
+from nerd.io.track_filter import _decimate_tracks, _drop_logging_off
+from nerd.io.track_store import _TrackStore
+from nerd.io.track_stream import _TrackStream
+from typing import Optional, Sequence
 import json
-import pandas as pd
+import numpy as np
 
 
 class Nerd:
@@ -23,6 +24,9 @@ class Nerd:
     config_file : str
         Path to the configuration file that contains parameters for density calculation (e.g., aperture diameter,
         swap width).
+    track_cache : TrackCache or None
+        Cache of parsed and projected track files, when the configuration sets `cache_path`. Use
+        `track_cache.entries()` and `track_cache.clear()` to inspect and clear it.
 
     Methods:
     -----------
@@ -31,6 +35,10 @@ class Nerd:
 
     export_results_geojson(target_density)
         Export the calculated density contours as a GeoJSON file.
+
+    calculate_density_percentiles(percentiles)
+        Calculate Monte Carlo percentile grids of the density, from the uncertainty of the flow rate
+        model.
     """
 
     def __init__(self, config_file_path):
@@ -39,13 +47,50 @@ class Nerd:
         -----------
         config_file_path: str
             Path to the configuration file that contains parameters for density calculation (e.g., aperture diameter,
-            swap width).
+            swap width). With `"dump_input_data": true`, the concatenated tracks are also written to
+            `input_concatenated_data.csv` in `output_path`. With `"chunk_size": n`, the tracks
+            are not loaded at once but streamed from disk in chunks of n points. With
+            `"cache_path": path`, parsed and projected track files are cached in that directory
+            (see `track_cache`). With `"ingest_workers": n`, n track files are parsed and
+            projected concurrently; `"max_pending_files"` bounds how many parsed files are held in
+            memory at once (twice the workers by default). With `"drop_logging_off": true`, rows
+            that release no bait and are not next to one that does are dropped at ingest, and with
+            `"simplify_tolerance": metres`, runs of dispersing points are simplified within that
+            distance (Douglas-Peucker), conserving the mass of the removed segments. Both need the
+            tracks in memory (no `chunk_size`).
         """
-        self.config_json_type_option = "series"
-        self.config_file = pd.read_json(config_file_path, typ=self.config_json_type_option)
-        self._tracmap_data = _import_multifile_tracmap(
-            self.config_file, "input_concatenated_data.csv"
+        self.config_file = _read_config(config_file_path)
+        # The concatenated tracks are written to output_path only if the configuration asks for it
+        dump_filename = (
+            "input_concatenated_data.csv"
+            if self.config_file.get("dump_input_data", False)
+            else None
         )
+        chunk_size = self.config_file.get("chunk_size")
+        cache_path = self.config_file.get("cache_path")
+        self.track_cache = None if cache_path is None else TrackCache(cache_path)
+        drop_logging_off = self.config_file.get("drop_logging_off", False)
+        simplify_tolerance = self.config_file.get("simplify_tolerance")
+        if chunk_size is None:
+            tracks = _TrackStore.from_config(
+                self.config_file,
+                dump_filename,
+                self.track_cache,
+                self.config_file.get("ingest_workers"),
+                self.config_file.get("max_pending_files"),
+            )
+            if drop_logging_off:
+                tracks = _drop_logging_off(tracks)
+            if simplify_tolerance is not None:
+                tracks = _decimate_tracks(tracks, float(simplify_tolerance))
+            self._tracmap_data = tracks
+        elif drop_logging_off or simplify_tolerance is not None:
+            raise ValueError(
+                "drop_logging_off and simplify_tolerance cannot be used with chunk_size"
+            )
+        else:
+            # Tracks are read from disk in chunks each time a map is calculated
+            self._tracmap_data = _TrackStream(self.config_file, int(chunk_size))
         self._spatial_resolution = self.config_file.get("spatial_resolution")
         self._flow_rate_function = _import_calibration_data(
             self.config_file.get("input_calibration_data")
@@ -59,6 +104,9 @@ class Nerd:
         a spatial grid. The process involves selecting parameters for each segment of the tracks, solving the density
         function, and summing up the density values within the corresponding grid cells.
         """
+        # nerd.mapping imports nerd.io, so it is imported when a map is calculated
+        from nerd.mapping.tiling import _calculate_total_density
+
         self._x_grid, self._y_grid, self._total_density = _calculate_total_density(
             self._tracmap_data,
             self.config_file,
@@ -66,6 +114,83 @@ class Nerd:
             self._flow_rate_function,
         )
 
+    def calculate_density_percentiles(
+        self,
+        percentiles: Sequence[float] = (2.5, 50, 97.5),
+        n_draws: int = 1000,
+        seed: Optional[int] = None,
+        n_workers: Optional[int] = None,
+        swath_width_sd: float = 0.0,
+        n_width_groups: int = 5,
+    ) -> np.ndarray:
+        """
+        Calculate percentile grids of the total density by Monte Carlo propagation of the
+        uncertainty in the coefficients of the flow rate model and in the swath width.
+
+        The density map is computed once per aperture diameter with a unit flow rate; each draw of
+        the coefficients is then a weighted sum of those maps. Swath widths are taken from the
+        configuration file, as they define the geometry of the map. With `swath_width_sd`, the
+        width distribution is split into `n_width_groups` groups of equal probability, the unit
+        flow maps are computed for the median width of each group, and the draws are spread evenly
+        over the groups (the maps take `n_width_groups` times longer to compute).
+
+        Parameters:
+        -----------
+        percentiles : Sequence[float]
+            Percentiles (0-100) to compute.
+        n_draws : int
+            Number of Monte Carlo draws of the flow rate coefficients.
+        seed : int, optional
+            Seed of the random number generator.
+        n_workers : int, optional
+            Number of worker processes used to evaluate chunks of grid cells.
+        swath_width_sd : float
+            Standard deviation (m) of the swath width of every file, around the configured width.
+            The widths are truncated so that the smallest one stays positive. 0 keeps the
+            configured widths.
+        n_width_groups : int
+            Number of swath width groups when `swath_width_sd` is positive.
+
+        Returns:
+        -----------
+        np.ndarray
+            Array with shape (len(percentiles),) + grid shape. It is also stored as the attribute
+            `density_percentiles`.
+        """
+        from nerd.mapping.tiling import _calculate_unit_flow_densities
+
+        offsets = [0.0]
+        if swath_width_sd > 0:
+            smallest_swath_width = min(
+                resource["swap_width"] for resource in self.config_file["resources"]
+            )
+            offsets = list(
+                swath_width_offsets(swath_width_sd, n_width_groups, smallest_swath_width)
+            )
+        width_groups = []
+        for offset in offsets:
+            self._x_grid, self._y_grid, aperture_diameters, unit_flow_densities = (
+                _calculate_unit_flow_densities(
+                    self._tracmap_data, self.config_file, self._spatial_resolution, offset
+                )
+            )
+            width_groups.append(unit_flow_densities)
+        flow_rate_covariance = _import_calibration_covariance(
+            self.config_file.get("input_calibration_data")
+        )
+        self.density_percentiles = density_map_percentiles(
+            np.array(width_groups),
+            aperture_diameters,
+            self._flow_rate_function.coeffs,
+            flow_rate_covariance,
+            percentiles,
+            n_draws,
+            seed,
+            n_workers,
+            grouped_by_width=True,
+        )
+        return self.density_percentiles
+
     def export_results_geojson(self, target_density: float) -> None:
         """
         Export the calculated density contours as a GeoJSON file.
@@ -88,10 +213,14 @@ class Nerd:
         ------
         - The method also stores the calculated contour levels as an attribute (`calculated_levels`) of the class.
         """
+        from nerd.mapping.tiling import _density_contours_intervals, _generate_contours
+
         self.calculated_levels = _density_contours_intervals(target_density, self._total_density)
         contours, _ = _generate_contours(
             self._x_grid, self._y_grid, self._total_density, self.calculated_levels
         )
+        import geojsoncontour
+
         geojson = geojsoncontour.contourf_to_geojson(contourf=contours, unit="m")
         geojson = json.loads(geojson)
         _check_output_directory(self.config_file.get("output_path"))
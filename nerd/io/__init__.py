@@ -1,12 +1,22 @@
+from nerd.io import projection  # noqa
 from nerd.io.geo2utm import _geo2utm  # noqa
 from nerd.io.import_data import (  # noqa
     _tracmap2csv,
     _import_tracmap,
     _import_calibration_data,
+    _import_calibration_covariance,
+    _import_flow_rate_model,
     _check_output_directory,
+    _read_config,
     _import_multifile_tracmap,
     _create_df_list,
+    _count_tracmap_rows,
+    _map_resources,
     _select_density_function,
     _select_parameters_by_index,
 )
-from nerd.io.Nerd import *  # noqa
+from nerd.io.track_cache import TrackCache, PARSER_VERSION  # noqa
+from nerd.io.track_store import _TrackStore  # noqa
+from nerd.io.track_stream import _TrackStream  # noqa
+from nerd.io.track_filter import _decimate_tracks, _douglas_peucker, _drop_logging_off  # noqa
+from nerd.io.Nerd import Nerd  # noqa
@@ -1,10 +1,31 @@
+from typing import Optional
+import numpy as np
 import pandas as pd
-import utm
+from nerd.io.projection import from_latlon, zone_letters, zone_numbers
+
+utm_columns = ["easting", "northing", "zone_number", "zone_letter"]
 
 
 def _geo2utm(csv_filename):
-    data = pd.read_csv(csv_filename)
-    data["easting"], data["northing"], data["zone_number"], data["zone_letter"] = utm.from_latlon(
-        data.Lat.values, data.Lon.values
+    return _add_utm_columns(pd.read_csv(csv_filename))
+
+
+def _add_utm_columns(
+    data: pd.DataFrame,
+    force_zone_number: Optional[int] = None,
+    force_zone_letter: Optional[str] = None,
+) -> pd.DataFrame:
+    # Every point is projected to one zone (by default that of the first point), so that the
+    # tracks of a map share one coordinate system
+    latitude = data.Lat.to_numpy(dtype=np.float64)
+    longitude = data.Lon.to_numpy(dtype=np.float64)
+    if force_zone_number is None:
+        force_zone_number = int(zone_numbers(latitude[:1], longitude[:1])[0])
+    if force_zone_letter is None:
+        force_zone_letter = str(zone_letters(latitude[:1])[0])
+    easting, northing, _, _ = from_latlon(
+        latitude, longitude, force_zone_number, northern=force_zone_letter >= "N"
     )
+    data["easting"], data["northing"] = easting, northing
+    data["zone_number"], data["zone_letter"] = force_zone_number, force_zone_letter
     return data
@@ -1,66 +1,238 @@
-from nerd.io.geo2utm import _geo2utm
-from nerd.calibration.fit_flow_rate import fit_flow_rate
-import nerd.density_functions
+from nerd.io.geo2utm import _add_utm_columns
+from nerd.calibration.fit_flow_rate import fit_flow_rate, fit_flow_rate_covariance
+from nerd.calibration.flow_rate_model import FlowRateModel
+from nerd.density_functions import get_density_function
+from nerd.io.schema import _check_constraints, _read_schema, _schema_dtypes
+import numpy as np
 import pandas as pd
+import json
 import os
-from typing import Callable
+from pandas.api.types import union_categoricals
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Deque, Dict, Iterator, List, Optional
 
 column_names = ["date", "time", "Lat", "Lon", "Speed", "heading", "Logging_on", "altitude"]
+tracmap_fields = _read_schema()
+tracmap_dtypes = _schema_dtypes(tracmap_fields)
 flux_calibation_colums = ["aperture_diameter", "flux"]
+_executors = {"thread": ThreadPoolExecutor, "process": ProcessPoolExecutor}
 
 
 def _tracmap2csv(tracmap_filename: str, csv_filename: str) -> None:
-    tracmap_data = pd.read_csv(
+    _read_tracmap_table(tracmap_filename).to_csv(csv_filename, index=False)
+
+
+def _read_tracmap_table(tracmap_filename: str) -> pd.DataFrame:
+    """
+    Parse a tracmap file with the dtypes that pandas infers, for the DataFrame
+        helpers (_import_tracmap, _import_multifile_tracmap). Tracks are
+        ingested with _read_tracmap
+    :param tracmap_filename: Path of the tracmap file
+    :return: Table with the columns of column_names
+    """
+    return pd.read_csv(
         tracmap_filename, header=None, names=column_names, usecols=[i for i in range(1, 9)]
     )
-    tracmap_data.to_csv(csv_filename, index=False)
 
 
-def _import_tracmap(tracmap_filename: str, csv_filename: str = "input_data.csv") -> pd.DataFrame:
-    _tracmap2csv(tracmap_filename, csv_filename)
-    return _geo2utm(csv_filename)
+def _read_tracmap(tracmap_filename: str) -> pd.DataFrame:
+    """
+    Parse a tracmap file (`$TMDAT,ddmmyyyy,HH:MM:SS,lat,lon,speed,heading,logging,altitude`)
+        with the dtypes of the tracmap schema (nerd/io/tracmap_schema.json)
+    :param tracmap_filename: Path of the tracmap file
+    :return: Table with the columns of column_names and `timestamp` (datetime64[s])
+    :raise ValueError: If a row breaks a constraint of the schema
+    """
+    tracmap_data = pd.read_csv(
+        tracmap_filename,
+        header=None,
+        names=column_names,
+        usecols=[i for i in range(1, 9)],
+        dtype=tracmap_dtypes,
+    )
+    _check_constraints(tracmap_data, tracmap_fields, tracmap_filename)
+    return _add_timestamp(tracmap_data)
+
+
+def _count_tracmap_rows(tracmap_filename: str) -> int:
+    """
+    :param tracmap_filename: Path of the tracmap file
+    :return: Number of rows that _read_tracmap returns, without converting or
+        checking the fields
+    """
+    return len(pd.read_csv(tracmap_filename, header=None, usecols=[1], dtype=str))
+
+
+def _add_timestamp(tracmap_data: pd.DataFrame) -> pd.DataFrame:
+    # Dates and times are categorical, so each distinct value is converted once
+    date = pd.Categorical(tracmap_data["date"])
+    time = pd.Categorical(tracmap_data["time"])
+    days = _tracmap_days(date.categories.to_numpy())
+    seconds = _tracmap_seconds(time.categories.to_numpy())
+    tracmap_data["timestamp"] = days[date.codes] + seconds[time.codes]
+    return tracmap_data
+
+
+def _tracmap_timestamps(date: np.ndarray, time: np.ndarray) -> np.ndarray:
+    """
+    Combine tracmap dates and times without parsing each string
+    :param date: Dates as ddmmyyyy strings or integers (e.g. 28032015)
+    :param time: Times as zero-padded HH:MM:SS strings
+    :return: Timestamps as datetime64[s]
+    """
+    return _tracmap_days(date) + _tracmap_seconds(time)
+
+
+def _tracmap_days(date: np.ndarray) -> np.ndarray:
+    date = np.asarray(date).astype(np.int64)
+    months = (date % 10000 - 1970).astype("datetime64[Y]").astype("datetime64[M]")
+    months += (date // 10000 % 100 - 1).astype("timedelta64[M]")
+    days = months.astype("datetime64[D]") + (date // 1000000 - 1).astype("timedelta64[D]")
+    return days.astype("datetime64[s]")
+
+
+def _tracmap_seconds(time: np.ndarray) -> np.ndarray:
+    # The digits of every time string, as one row of 8 bytes per point
+    digits = np.asarray(time, dtype="S8").view(np.uint8).reshape(-1, 8).astype(np.int64)
+    digits -= ord("0")
+    seconds = (
+        (digits[:, 0] * 10 + digits[:, 1]) * 3600
+        + (digits[:, 3] * 10 + digits[:, 4]) * 60
+        + digits[:, 6] * 10
+        + digits[:, 7]
+    )
+    return seconds.astype("timedelta64[s]")
 
 
-def _import_calibration_data(flux_filename: str) -> Callable:
-    flux_data = pd.read_csv(
+def _column_values(column: pd.Series):
+    """
+    :param column: Column of a table
+    :return: pd.Categorical for categorical columns, np.ndarray otherwise
+    """
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        return column.array
+    return column.to_numpy()
+
+
+def _concatenate_columns(columns: List):
+    """
+    :param columns: Pieces of one column, as returned by _column_values
+    :return: Concatenated column; categories are merged
+    """
+    if isinstance(columns[0], pd.Categorical):
+        return union_categoricals(columns)
+    return np.concatenate(columns)
+
+
+def _import_tracmap(tracmap_filename: str, csv_filename: Optional[str] = None) -> pd.DataFrame:
+    tracmap_data = _read_tracmap_table(tracmap_filename)
+    if csv_filename is not None:
+        tracmap_data.to_csv(csv_filename, index=False)
+    return _add_utm_columns(tracmap_data)
+
+
+def _read_calibration_data(flux_filename: str) -> pd.DataFrame:
+    return pd.read_csv(
         flux_filename,
         header=None,
         skiprows=1,
         names=flux_calibation_colums,
         usecols=[i for i in range(0, 2)],
     )
+
+
+def _import_calibration_data(flux_filename: str) -> Callable:
+    flux_data = _read_calibration_data(flux_filename)
     return fit_flow_rate(flux_data["aperture_diameter"].to_numpy(), flux_data["flux"].to_numpy())
 
 
+def _import_calibration_covariance(flux_filename: str) -> np.ndarray:
+    flux_data = _read_calibration_data(flux_filename)
+    return fit_flow_rate_covariance(
+        flux_data["aperture_diameter"].to_numpy(), flux_data["flux"].to_numpy()
+    )
+
+
+def _import_flow_rate_model(
+    flux_filename: str, group_column: Optional[str] = None
+) -> FlowRateModel:
+    flux_data = pd.read_csv(flux_filename)
+    return FlowRateModel.fit(
+        flux_data.iloc[:, 0].to_numpy(),
+        flux_data.iloc[:, 1].to_numpy(),
+        None if group_column is None else flux_data[group_column].to_numpy(),
+    )
+
+
+def _read_config(config_file_path: str) -> dict:
+    """
+    :param config_file_path: Path of a JSON configuration file
+    :return: Configuration as a dictionary
+    """
+    with open(config_file_path) as config_file:
+        return json.load(config_file)
+
+
 def _check_output_directory(output_path: str) -> None:
     if not os.path.exists(output_path):
         os.mkdir(output_path)
 
 
-def _import_multifile_tracmap(config_file: pd.Series, csv_filename: str) -> pd.DataFrame:
-    df_list = _create_df_list(config_file)
-    df_concat = pd.concat(df_list)
-    output_path = str(config_file.get("output_path"))
-    _check_output_directory(output_path)
-    concatenated_tracmap_path = "{}/{}".format(output_path, csv_filename)
-    df_concat.to_csv(concatenated_tracmap_path, index=False)
-    return _geo2utm(concatenated_tracmap_path)
-
-
-def _create_df_list(config_file: pd.Series) -> list:
-    df_list = [
-        pd.read_csv(
-            resources["input_data_path"],
-            header=None,
-            names=column_names,
-            usecols=[i for i in range(1, 9)],
-        )
-        for resources in config_file["resources"]
-    ]
+def _import_multifile_tracmap(
+    config_file: Dict, csv_filename: Optional[str] = None
+) -> pd.DataFrame:
+    df_concat = pd.concat(_create_df_list(config_file), ignore_index=True)
+    if csv_filename is not None:
+        # Debug dump of the concatenated tracks, before projection
+        output_path = str(config_file.get("output_path"))
+        _check_output_directory(output_path)
+        df_concat.to_csv("{}/{}".format(output_path, csv_filename), index=False)
+    return _add_utm_columns(df_concat)
+
+
+def _create_df_list(
+    config_file: Dict, n_workers: Optional[int] = None, max_pending_files: Optional[int] = None
+) -> list:
+    df_list = list(_map_resources(_read_tracmap_table, config_file, n_workers, max_pending_files))
     return df_list
 
 
-def _select_parameters_by_index(config_file: pd.Series, n_file: int) -> tuple:
+def _map_resources(
+    function: Callable,
+    config_file: Dict,
+    n_workers: Optional[int] = None,
+    max_pending_files: Optional[int] = None,
+    executor: str = "thread",
+) -> Iterator:
+    """
+    Apply a function to the path of every resource in the configuration
+    :param function: Function of the path of a tracmap file
+    :param config_file: Configuration with `resources`
+    :param n_workers: Number of files processed concurrently. Serial if None
+    :param max_pending_files: Maximum number of files submitted or finished but
+        not yet consumed, which bounds the memory held by the results (defaults
+        to twice n_workers)
+    :param executor: "thread" or "process" (function must be picklable)
+    :return: Iterator over the results, in the order of the resources
+    """
+    paths = [resources["input_data_path"] for resources in config_file["resources"]]
+    if n_workers is None or n_workers < 2 or len(paths) < 2:
+        yield from map(function, paths)
+        return
+    if max_pending_files is None:
+        max_pending_files = 2 * n_workers
+    with _executors[executor](max_workers=n_workers) as pool:
+        pending: Deque[Future] = deque()
+        for path in paths:
+            if len(pending) >= max(1, max_pending_files):
+                yield pending.popleft().result()
+            pending.append(pool.submit(function, path))
+        while pending:
+            yield pending.popleft().result()
+
+
+def _select_parameters_by_index(config_file: Dict, n_file: int) -> tuple:
     aperture_diameter = config_file["resources"][n_file]["aperture_diameter"]
     swap_width = config_file["resources"][n_file]["swap_width"]
     density_function = _select_density_function(
@@ -70,4 +242,4 @@ def _select_parameters_by_index(config_file: pd.Series, n_file: int) -> tuple:
 
 
 def _select_density_function(function_name: str) -> Callable:
-    return getattr(nerd.density_functions, function_name)
+    return get_density_function(function_name).function
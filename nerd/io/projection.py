@@ -0,0 +1,222 @@
+from typing import Callable, Optional, Tuple, Union
+import numpy as np
+
+# WGS 84 ellipsoid and UTM constants
+EQUATORIAL_RADIUS = 6378137.0
+FLATTENING = 1 / 298.257223563
+SCALE_FACTOR = 0.9996
+FALSE_EASTING = 500000.0
+FALSE_NORTHING = 10000000.0
+ZONE_LETTERS = np.array(list("CDEFGHJKLMNPQRSTUVWXX"))
+# Points are transformed in blocks of this size, which keep the intermediate arrays in cache
+BLOCK_SIZE = 8192
+
+_n = FLATTENING / (2 - FLATTENING)
+_eccentricity = np.sqrt(FLATTENING * (2 - FLATTENING))
+# Krüger series to fourth order in the third flattening n (Karney, 2011). The next terms are
+# O(n^5), below a micrometre on the ground.
+_rectifying_radius = EQUATORIAL_RADIUS / (1 + _n) * (1 + _n**2 / 4 + _n**4 / 64)
+_alpha = np.array(
+    [
+        _n / 2 - 2 * _n**2 / 3 + 5 * _n**3 / 16 + 41 * _n**4 / 180,
+        13 * _n**2 / 48 - 3 * _n**3 / 5 + 557 * _n**4 / 1440,
+        61 * _n**3 / 240 - 103 * _n**4 / 140,
+        49561 * _n**4 / 161280,
+    ]
+)
+_beta = np.array(
+    [
+        _n / 2 - 2 * _n**2 / 3 + 37 * _n**3 / 96 - _n**4 / 360,
+        _n**2 / 48 + _n**3 / 15 - 437 * _n**4 / 1440,
+        17 * _n**3 / 480 - 37 * _n**4 / 840,
+        4397 * _n**4 / 161280,
+    ]
+)
+_delta = np.array(
+    [
+        2 * _n - 2 * _n**2 / 3 - 2 * _n**3 + 116 * _n**4 / 45,
+        7 * _n**2 / 3 - 8 * _n**3 / 5 - 227 * _n**4 / 45,
+        56 * _n**3 / 15 - 136 * _n**4 / 35,
+        4279 * _n**4 / 630,
+    ]
+)
+_meters_per_radian = SCALE_FACTOR * _rectifying_radius
+
+
+def zone_numbers(latitude: np.ndarray, longitude: np.ndarray) -> np.ndarray:
+    """
+    UTM zone of each point, with the exceptions of southwest Norway and
+        Svalbard
+    :param latitude: Latitudes (decimal degrees)
+    :param longitude: Longitudes (decimal degrees)
+    :return: Zone numbers (1-60)
+    """
+    latitude, longitude = np.broadcast_arrays(
+        np.asarray(latitude, dtype=float), np.asarray(longitude, dtype=float)
+    )
+    longitude = (longitude + 180) % 360 - 180
+    zone = np.floor((longitude + 180) / 6).astype(np.int64) + 1
+    zone = np.where(
+        (latitude >= 56) & (latitude < 64) & (longitude >= 3) & (longitude < 12), 32, zone
+    )
+    is_svalbard = (latitude >= 72) & (latitude <= 84) & (longitude >= 0) & (longitude < 42)
+    svalbard_zone = 2 * np.floor((longitude + 3) / 12).astype(np.int64) + 31
+    return np.where(is_svalbard, svalbard_zone, zone)
+
+
+def zone_letters(latitude: np.ndarray) -> np.ndarray:
+    """
+    :param latitude: Latitudes (decimal degrees) between -80 and 84
+    :return: Latitude band letter of each point
+    """
+    latitude = np.asarray(latitude, dtype=float)
+    band = np.clip(np.floor((latitude + 80) / 8).astype(np.int64), 0, len(ZONE_LETTERS) - 1)
+    return ZONE_LETTERS[band]
+
+
+def central_meridian(zone_number: Union[int, np.ndarray]) -> np.ndarray:
+    """
+    :param zone_number: UTM zone numbers
+    :return: Longitude (decimal degrees) of the central meridian of each zone
+    """
+    return (np.asarray(zone_number) - 1) * 6 - 180 + 3
+
+
+def from_latlon(
+    latitude: np.ndarray,
+    longitude: np.ndarray,
+    zone_number: Optional[Union[int, np.ndarray]] = None,
+    northern: Optional[Union[bool, np.ndarray]] = None,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Project geographic coordinates to UTM (transverse Mercator on WGS 84)
+    :param latitude: Latitudes (decimal degrees)
+    :param longitude: Longitudes (decimal degrees)
+    :param zone_number: Zone used for every point (e.g. to keep a map in one
+        zone across a zone boundary), or one zone per point. Each point uses
+        its own zone if None
+    :param northern: Whether northings are measured from the equator (True) or
+        from the false northing of the southern hemisphere (False). From the
+        sign of each latitude if None
+    :return: Easting (m), northing (m), zone number and zone letter of each
+        point
+    """
+    latitude, longitude = np.broadcast_arrays(
+        np.asarray(latitude, dtype=np.float64), np.asarray(longitude, dtype=np.float64)
+    )
+    if zone_number is None:
+        zone_number = zone_numbers(latitude, longitude)
+    if northern is None:
+        northern = latitude >= 0
+    zone_number = np.broadcast_to(np.asarray(zone_number, dtype=np.int64), latitude.shape)
+    easting, northing = _map_blocks(
+        _forward,
+        latitude,
+        longitude,
+        central_meridian(zone_number),
+        np.broadcast_to(np.asarray(northern, dtype=bool), latitude.shape),
+    )
+    return easting, northing, zone_number, zone_letters(latitude)
+
+
+def to_latlon(
+    easting: np.ndarray,
+    northing: np.ndarray,
+    zone_number: Union[int, np.ndarray],
+    northern: Union[bool, np.ndarray],
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Inverse of from_latlon
+    :param easting: Eastings (m)
+    :param northing: Northings (m)
+    :param zone_number: Zone of every point, or one zone per point
+    :param northern: Whether the points are in the northern hemisphere (see
+        from_latlon), for every point or per point
+    :return: Latitude and longitude (decimal degrees) of each point
+    """
+    easting, northing = np.broadcast_arrays(
+        np.asarray(easting, dtype=np.float64), np.asarray(northing, dtype=np.float64)
+    )
+    return _map_blocks(
+        _inverse,
+        easting,
+        northing,
+        np.broadcast_to(central_meridian(zone_number), easting.shape),
+        np.broadcast_to(np.asarray(northern, dtype=bool), easting.shape),
+    )
+
+
+def _map_blocks(transform: Callable, *inputs: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    # The loop runs over blocks of points; every point of a block is transformed at once
+    shape = inputs[0].shape
+    flat_inputs = [np.ravel(array) for array in inputs]
+    first, second = np.empty(flat_inputs[0].size), np.empty(flat_inputs[0].size)
+    for start in range(0, first.size, BLOCK_SIZE):
+        block = slice(start, start + BLOCK_SIZE)
+        first[block], second[block] = transform(*[array[block] for array in flat_inputs])
+    return first.reshape(shape), second.reshape(shape)
+
+
+def _forward(
+    latitude: np.ndarray, longitude: np.ndarray, meridian: np.ndarray, northern: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    lam = np.radians(longitude - meridian)
+    lam = (lam + np.pi) % (2 * np.pi) - np.pi
+    sin_phi = np.sin(np.radians(latitude))
+    conformal = np.sinh(np.arctanh(sin_phi) - _eccentricity * np.arctanh(_eccentricity * sin_phi))
+    cos_lam = np.cos(lam)
+    xi_prime = np.arctan2(conformal, cos_lam)
+    eta_prime = np.arcsinh(np.sin(lam) / np.hypot(conformal, cos_lam))
+    xi, eta = _add_series(xi_prime, eta_prime, _alpha)
+    easting = FALSE_EASTING + _meters_per_radian * eta
+    northing = _meters_per_radian * xi + np.where(northern, 0, FALSE_NORTHING)
+    return easting, northing
+
+
+def _inverse(
+    easting: np.ndarray, northing: np.ndarray, meridian: np.ndarray, northern: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    xi = (northing - np.where(northern, 0, FALSE_NORTHING)) / _meters_per_radian
+    eta = (easting - FALSE_EASTING) / _meters_per_radian
+    xi_prime, eta_prime = _add_series(xi, eta, -_beta)
+    conformal_latitude = np.arcsin(np.sin(xi_prime) / np.cosh(eta_prime))
+    phi = _add_real_series(conformal_latitude, _delta)
+    longitude = np.degrees(np.arctan2(np.sinh(eta_prime), np.cos(xi_prime))) + meridian
+    return np.degrees(phi), (longitude + 180) % 360 - 180
+
+
+def _add_series(
+    xi: np.ndarray, eta: np.ndarray, coefficients: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    # zeta + sum of coefficient_j * sin(2 j zeta) for zeta = xi + i eta, by Clenshaw summation in
+    # real arithmetic: the trigonometric functions are evaluated once, then only products remain
+    sin_xi, cos_xi = np.sin(2 * xi), np.cos(2 * xi)
+    sinh_eta, cosh_eta = np.sinh(2 * eta), np.cosh(2 * eta)
+    # 2 cos(2 zeta) = real + i imaginary
+    real = 2 * cos_xi * cosh_eta
+    imaginary = -2 * sin_xi * sinh_eta
+    current_real, current_imaginary = np.full_like(xi, coefficients[-1]), np.zeros_like(xi)
+    following_real, following_imaginary = np.zeros_like(xi), np.zeros_like(xi)
+    for coefficient in coefficients[-2::-1]:
+        following_real, current_real, following_imaginary, current_imaginary = (
+            current_real,
+            real * current_real - imaginary * current_imaginary - following_real + coefficient,
+            current_imaginary,
+            real * current_imaginary + imaginary * current_real - following_imaginary,
+        )
+    # Multiply by sin(2 zeta)
+    sin_real = sin_xi * cosh_eta
+    sin_imaginary = cos_xi * sinh_eta
+    series_xi = current_real * sin_real - current_imaginary * sin_imaginary
+    series_eta = current_real * sin_imaginary + current_imaginary * sin_real
+    return xi + series_xi, eta + series_eta
+
+
+def _add_real_series(angle: np.ndarray, coefficients: np.ndarray) -> np.ndarray:
+    # angle + sum of coefficient_j * sin(2 j angle), by Clenshaw summation
+    twice_cosine = 2 * np.cos(2 * angle)
+    following = np.zeros_like(angle)
+    current = np.full_like(angle, coefficients[-1])
+    for coefficient in coefficients[-2::-1]:
+        following, current = current, twice_cosine * current - following + coefficient
+    return angle + current * np.sin(2 * angle)
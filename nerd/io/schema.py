@@ -0,0 +1,89 @@
+from typing import Dict, List
+import json
+import os
+import numpy as np
+import pandas as pd
+
+# Table Schema (https://specs.frictionlessdata.io/table-schema/) of the tracmap fields, as in the
+# datapackage.json of the input data, plus a `dtype` where float32 is not precise enough
+tracmap_schema_path = os.path.join(os.path.dirname(__file__), "tracmap_schema.json")
+# Default format of the Table Schema time type
+_TIME_PATTERN = "([01][0-9]|2[0-3]):[0-5][0-9]:[0-5][0-9]"
+
+
+def _read_schema(schema_path: str = tracmap_schema_path) -> List[Dict]:
+    with open(schema_path) as schema_file:
+        return json.load(schema_file)["fields"]
+
+
+def _schema_dtypes(fields: List[Dict]) -> Dict:
+    """
+    Compact dtypes of the fields of a Table Schema
+    :param fields: Fields of the schema
+    :return: dtype of each field: categorical for strings with a pattern and
+        times (few distinct values), uint8 for booleans, float32 for numbers
+        unless the field sets its `dtype`
+    """
+    dtypes: Dict = {}
+    for field in fields:
+        if "dtype" in field:
+            dtypes[field["name"]] = np.dtype(field["dtype"])
+        elif field["type"] == "number":
+            dtypes[field["name"]] = np.float32
+        elif field["type"] == "integer":
+            dtypes[field["name"]] = np.int32
+        elif field["type"] == "boolean":
+            dtypes[field["name"]] = np.uint8
+        elif field["type"] == "time" or "pattern" in field.get("constraints", {}):
+            dtypes[field["name"]] = "category"
+        else:
+            dtypes[field["name"]] = str
+    return dtypes
+
+
+def _check_constraints(data: pd.DataFrame, fields: List[Dict], source: str) -> None:
+    """
+    Check the constraints of a Table Schema on whole columns
+    :param data: Table with the fields as columns
+    :param fields: Fields of the schema
+    :param source: Name of the data (e.g. file name) used in the error messages
+    :raise ValueError: With the first constraint that some row breaks
+    """
+    for field in fields:
+        name = field["name"]
+        column = data[name]
+        constraints = field.get("constraints", {})
+        if constraints.get("required", False):
+            _raise_if_any(column.isna().to_numpy(), source, name, "is missing")
+        if "minimum" in constraints:
+            below = column.to_numpy() < constraints["minimum"]
+            _raise_if_any(below, source, name, "is below {}".format(constraints["minimum"]))
+        if "maximum" in constraints:
+            above = column.to_numpy() > constraints["maximum"]
+            _raise_if_any(above, source, name, "is above {}".format(constraints["maximum"]))
+        if field["type"] == "boolean":
+            _raise_if_any(column.to_numpy() > 1, source, name, "is not 0 or 1")
+        pattern = _TIME_PATTERN if field["type"] == "time" else constraints.get("pattern")
+        if pattern is not None:
+            # Only the distinct values are matched, which are few in categorical columns
+            values = pd.Series(
+                (
+                    column.cat.categories
+                    if isinstance(column.dtype, pd.CategoricalDtype)
+                    else column.dropna().unique()
+                ),
+                dtype=str,
+            )
+            is_valid = values.str.fullmatch(pattern).to_numpy(dtype=bool)
+            if not is_valid.all():
+                invalid = column.isin(values[~is_valid]).to_numpy()
+                _raise_if_any(invalid, source, name, "does not match {}".format(pattern))
+
+
+def _raise_if_any(is_invalid: np.ndarray, source: str, name: str, message: str) -> None:
+    if is_invalid.any():
+        raise ValueError(
+            "{}: {} of {} rows where {} {} (first at row {})".format(
+                source, is_invalid.sum(), len(is_invalid), name, message, np.argmax(is_invalid)
+            )
+        )
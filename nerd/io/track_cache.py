@@ -0,0 +1,170 @@
+from typing import Dict, Optional
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+from nerd.io.geo2utm import _add_utm_columns
+from nerd.io.import_data import _read_tracmap
+
+# Increase when the parsing or the projection of tracmap files changes, so old entries are not used
+PARSER_VERSION = 4
+_METADATA_FILENAME = "metadata.json"
+# Prefix of the directories where entries are written before they are complete
+_PARTIAL_PREFIX = ".partial-"
+# Names of the entries: SHA-256 of the file content and parser version
+_ENTRY_KEY_PATTERN = re.compile(r"^[0-9a-f]{64}-v\d+$")
+
+
+class TrackCache:
+    """
+    On-disk cache of parsed and UTM-projected tracmap files.
+
+    Each input file is stored as one `.npy` array per column in a directory named after the SHA-256
+    of the file content and the parser version, so edited files and parser upgrades miss the cache
+    and stale entries are never used. Arrays are opened memory-mapped.
+
+    Attributes:
+    -----------
+    path : str
+        Directory of the cache. It is created when the first entry is stored.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def load(self, tracmap_filename: str) -> Dict[str, np.ndarray]:
+        """
+        Columns of a projected tracmap file, parsed and stored on the first call
+        :param tracmap_filename: Path of the tracmap file
+        :return: One read-only array (pd.Categorical for categorical columns) per
+            column, in the order of _read_tracmap and _add_utm_columns
+        """
+        entry_path = os.path.join(self.path, self.key(tracmap_filename))
+        if not os.path.isdir(entry_path):
+            self._store(entry_path, tracmap_filename)
+        with open(os.path.join(entry_path, _METADATA_FILENAME)) as metadata_file:
+            metadata = json.load(metadata_file)
+        columns = {
+            name: np.load(os.path.join(entry_path, "{}.npy".format(name)), mmap_mode="r")
+            for name in metadata["columns"]
+        }
+        for name in metadata["categorical"]:
+            # Categorical columns are stored as their codes and their categories
+            categories = np.load(os.path.join(entry_path, "{}.categories.npy".format(name)))
+            columns[name] = pd.Categorical.from_codes(columns[name], categories)
+        return columns
+
+    def key(self, tracmap_filename: str) -> str:
+        """
+        :param tracmap_filename: Path of the tracmap file
+        :return: Name of the entry of the file: hash of its content and parser
+            version
+        """
+        return "{}-v{}".format(_hash_file(tracmap_filename), PARSER_VERSION)
+
+    def entries(self) -> pd.DataFrame:
+        """
+        :return: Table with one row per entry and the columns `key`, `source`,
+            `parser_version`, `n_rows` and `size_bytes`
+        """
+        rows = []
+        if os.path.isdir(self.path):
+            for key in sorted(os.listdir(self.path)):
+                metadata_path = os.path.join(self.path, key, _METADATA_FILENAME)
+                if key.startswith(_PARTIAL_PREFIX) or not os.path.isfile(metadata_path):
+                    continue
+                with open(metadata_path) as metadata_file:
+                    metadata = json.load(metadata_file)
+                entry_path = os.path.join(self.path, key)
+                size_bytes = sum(
+                    os.path.getsize(os.path.join(entry_path, filename))
+                    for filename in os.listdir(entry_path)
+                )
+                rows.append(
+                    {
+                        "key": key,
+                        "source": metadata["source"],
+                        "parser_version": metadata["parser_version"],
+                        "n_rows": metadata["n_rows"],
+                        "size_bytes": size_bytes,
+                    }
+                )
+        return pd.DataFrame(
+            rows, columns=["key", "source", "parser_version", "n_rows", "size_bytes"]
+        )
+
+    def clear(self, parser_version: Optional[int] = None) -> int:
+        """
+        Remove entries from the cache, and the directories left by interrupted
+            writes (do not clear while another process fills the cache). Files
+            and directories not written by the cache are kept
+        :param parser_version: Remove only the entries of this parser version
+            (e.g. the outdated ones). All entries if None
+        :return: Number of removed entries and leftover directories
+        """
+        entries = self.entries()
+        if parser_version is not None:
+            entries = entries[entries.parser_version == parser_version]
+        for key in entries.key:
+            shutil.rmtree(os.path.join(self.path, key))
+        return len(entries) + self._clear_partial_entries()
+
+    def _clear_partial_entries(self) -> int:
+        # Only directories written by the cache are removed, other content of the path is kept
+        n_removed = 0
+        if os.path.isdir(self.path):
+            for key in os.listdir(self.path):
+                entry_path = os.path.join(self.path, key)
+                is_partial = key.startswith(_PARTIAL_PREFIX) or (
+                    _ENTRY_KEY_PATTERN.match(key) is not None
+                    and not os.path.isfile(os.path.join(entry_path, _METADATA_FILENAME))
+                )
+                if os.path.isdir(entry_path) and is_partial:
+                    shutil.rmtree(entry_path)
+                    n_removed += 1
+        return n_removed
+
+    def _store(self, entry_path: str, tracmap_filename: str) -> None:
+        track_data = _add_utm_columns(_read_tracmap(tracmap_filename))
+        os.makedirs(self.path, exist_ok=True)
+        # Write into a temporary directory first, so an interrupted run leaves no partial entry
+        temporary_path = tempfile.mkdtemp(prefix=_PARTIAL_PREFIX, dir=self.path)
+        categorical = []
+        for name in track_data.columns:
+            column = track_data[name]
+            if isinstance(column.dtype, pd.CategoricalDtype):
+                categorical.append(name)
+                categories = column.cat.categories.to_numpy().astype(str)
+                np.save(os.path.join(temporary_path, "{}.categories.npy".format(name)), categories)
+                values = column.cat.codes.to_numpy()
+            else:
+                values = column.to_numpy()
+                if values.dtype == object:
+                    values = values.astype(str)
+            np.save(os.path.join(temporary_path, "{}.npy".format(name)), values)
+        metadata = {
+            "source": os.path.abspath(tracmap_filename),
+            "parser_version": PARSER_VERSION,
+            "columns": list(track_data.columns),
+            "categorical": categorical,
+            "n_rows": len(track_data),
+        }
+        with open(os.path.join(temporary_path, _METADATA_FILENAME), "w") as metadata_file:
+            json.dump(metadata, metadata_file)
+        try:
+            os.rename(temporary_path, entry_path)
+        except OSError:
+            # Another process stored the same entry
+            shutil.rmtree(temporary_path)
+
+
+def _hash_file(filename: str, block_size: int = 1 << 20) -> str:
+    file_hash = hashlib.sha256()
+    with open(filename, "rb") as input_file:
+        for block in iter(lambda: input_file.read(block_size), b""):
+            file_hash.update(block)
+    return file_hash.hexdigest()
@@ -0,0 +1,127 @@
+from typing import Optional
+import numpy as np
+from nerd.io.track_store import _TrackStore
+
+# Rows used by the tile of a track point: the point before it and the two after it
+_TILE_NEIGHBOURS = (-1, 1, 2)
+
+
+def _is_dispersing(tracks: _TrackStore) -> np.ndarray:
+    """
+    :param tracks: _TrackStore
+    :return: Whether bait is released at each row (bucket on and helicopter
+        moving), as in _calculate_total_density
+    """
+    return (tracks["Logging_on"] != 0) & (tracks["Speed"] != 0)
+
+
+def _drop_logging_off(tracks: _TrackStore) -> _TrackStore:
+    """
+    Remove the rows that neither release bait nor shape the tile of a row that
+        does, e.g. ferry legs and hovering
+    :param tracks: _TrackStore
+    :return: _TrackStore with the same density map, up to the extent of its grid
+    """
+    is_dispersing = _is_dispersing(tracks)
+    keep = is_dispersing.copy()
+    for offset in _TILE_NEIGHBOURS:
+        # Row i is needed when row i - offset releases bait
+        if offset > 0:
+            keep[offset:] |= is_dispersing[:-offset]
+        else:
+            keep[:offset] |= is_dispersing[-offset:]
+    return tracks.take(keep)
+
+
+def _decimate_tracks(tracks: _TrackStore, tolerance: float) -> _TrackStore:
+    """
+    Simplify the runs of dispersing rows with the Douglas-Peucker algorithm.
+        Rows that do not release bait, the first and last rows of every run
+        and file, and the last two rows are kept, so tiles do not span ferry
+        legs or join files. Each kept row gets the speed that delivers the
+        mass of the rows it replaces over its merged segment
+    :param tracks: _TrackStore
+    :param tolerance: Largest distance (m) between a removed point and the
+        simplified track
+    :return: _TrackStore with the kept rows
+    """
+    if len(tracks) < 3:
+        return tracks
+    is_dispersing = _is_dispersing(tracks)
+    fixed = ~is_dispersing
+    # The first and last row of each run of dispersing rows of one file
+    is_run_start = np.ones(len(tracks), dtype=bool)
+    is_run_start[1:] = ~is_dispersing[:-1] | (np.diff(tracks.file_index) != 0)
+    is_run_end = np.ones(len(tracks), dtype=bool)
+    is_run_end[:-1] = is_run_start[1:]
+    fixed |= is_run_start | is_run_end
+    # The last two rows shape the tiles of the rows before them but have no tile of their own
+    fixed[-2:] = True
+    x, y = tracks["easting"], tracks["northing"]
+    keep = _douglas_peucker(x, y, tolerance, fixed)
+    # The tile of row i spans from point i to point i + 1 and delivers (flow rate / speed) per
+    # metre, so a merged segment conserves mass with its length over the summed length / speed
+    segment_length = np.hypot(np.diff(x), np.diff(y))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mass_per_flow_rate = np.where(is_dispersing[:-1], segment_length / tracks["Speed"][:-1], 0)
+    kept_rows = np.flatnonzero(keep)
+    merged_length = np.hypot(np.diff(x[kept_rows]), np.diff(y[kept_rows]))
+    # Merged segments of zero length would deliver no mass, so their rows are kept
+    for start, end in zip(kept_rows[:-1][merged_length == 0], kept_rows[1:][merged_length == 0]):
+        keep[start:end] = True
+    kept_rows = np.flatnonzero(keep)
+    merged_length = np.hypot(np.diff(x[kept_rows]), np.diff(y[kept_rows]))
+    merged_mass = np.add.reduceat(mass_per_flow_rate, kept_rows[:-1])
+    decimated = tracks.take(keep)
+    is_merged = np.flatnonzero(np.diff(kept_rows) > 1)
+    decimated["Speed"][is_merged] = merged_length[is_merged] / merged_mass[is_merged]
+    return decimated
+
+
+def _douglas_peucker(
+    x: np.ndarray, y: np.ndarray, tolerance: float, fixed: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    Douglas-Peucker simplification of a polyline
+    :param x: Coordinates (m) of the points
+    :param y: Coordinates (m) of the points
+    :param tolerance: Largest distance (m) between a removed point and the
+        segment that replaces it
+    :param fixed: Points that are always kept. The first and the last point
+        are always kept
+    :return: Mask of the kept points
+    """
+    keep = np.zeros(len(x), dtype=bool) if fixed is None else np.array(fixed, dtype=bool)
+    if len(x) == 0:
+        return keep
+    keep[[0, -1]] = True
+    kept_points = np.flatnonzero(keep)
+    intervals = [
+        (start, end) for start, end in zip(kept_points[:-1], kept_points[1:]) if end - start > 1
+    ]
+    while intervals:
+        start, end = intervals.pop()
+        distance = _distance_to_segment(
+            x[start + 1 : end], y[start + 1 : end], x[start], y[start], x[end], y[end]
+        )
+        farthest = int(np.argmax(distance))
+        if distance[farthest] > tolerance:
+            split = start + 1 + farthest
+            keep[split] = True
+            intervals.extend(
+                interval
+                for interval in ((start, split), (split, end))
+                if interval[1] - interval[0] > 1
+            )
+    return keep
+
+
+def _distance_to_segment(
+    x: np.ndarray, y: np.ndarray, x_start: float, y_start: float, x_end: float, y_end: float
+) -> np.ndarray:
+    dx, dy = x_end - x_start, y_end - y_start
+    squared_length = dx**2 + dy**2
+    if squared_length == 0:
+        return np.hypot(x - x_start, y - y_start)
+    t = np.clip(((x - x_start) * dx + (y - y_start) * dy) / squared_length, 0, 1)
+    return np.hypot(x - x_start - t * dx, y - y_start - t * dy)
@@ -0,0 +1,178 @@
+from functools import partial
+from typing import Callable, Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from nerd.io.geo2utm import _add_utm_columns, utm_columns
+from nerd.io.track_cache import TrackCache
+from nerd.io.import_data import (
+    column_names,
+    _check_output_directory,
+    _column_values,
+    _concatenate_columns,
+    _map_resources,
+    _read_tracmap,
+    _select_parameters_by_index,
+)
+from nerd.io.projection import zone_letters, zone_numbers
+
+
+class _TrackStore:
+    """
+    Helicopter tracks of every input file of a configuration, parsed once at ingest.
+
+    Attributes:
+    -----------
+    columns : Dict[str, np.ndarray]
+        One array per column of the concatenated tracks (tracmap columns plus UTM coordinates).
+    file_index : np.ndarray
+        Position, in the `resources` of the configuration, of the file each row comes from.
+    file_parameters : list
+        Aperture diameter (mm), swath width (m) and density function of each file, as returned by
+        `_select_parameters_by_index`.
+    """
+
+    def __init__(
+        self, columns: Dict[str, np.ndarray], file_index: np.ndarray, file_parameters: List
+    ):
+        self.columns = columns
+        self.file_index = np.asarray(file_index, dtype=np.intp)
+        self.file_parameters = file_parameters
+
+    @classmethod
+    def from_config(
+        cls,
+        config_file: Dict,
+        csv_filename: Optional[str] = None,
+        cache: Optional[TrackCache] = None,
+        n_workers: Optional[int] = None,
+        max_pending_files: Optional[int] = None,
+    ) -> "_TrackStore":
+        """
+        Read, concatenate and project the tracks of every resource in the
+            configuration
+        :param config_file: Configuration with `resources` and `output_path`
+        :param csv_filename: If given, the concatenated tracks are also written to
+            this file in `output_path` (debug dump)
+        :param cache: Optional TrackCache where parsed and projected files are
+            stored and looked up
+        :param n_workers: Number of files parsed and projected concurrently.
+            Serial if None
+        :param max_pending_files: Maximum number of parsed files held before
+            they are added to the store (defaults to twice n_workers)
+        :return: _TrackStore
+        """
+        load: Callable[[str], Dict[str, np.ndarray]]
+        if cache is None:
+            zone_number, zone_letter = _first_point_zone(config_file)
+            load = partial(
+                _read_projected_columns, zone_number=zone_number, zone_letter=zone_letter
+            )
+        else:
+            load = cache.load
+        file_columns: List[Dict[str, np.ndarray]] = []
+        for columns in _map_resources(load, config_file, n_workers, max_pending_files):
+            if file_columns:
+                zone_number = file_columns[0]["zone_number"][0]
+                zone_letter = file_columns[0]["zone_letter"][0]
+                if (
+                    columns["zone_number"][0] != zone_number
+                    or columns["zone_letter"][0] != zone_letter
+                ):
+                    # Every point is projected to the zone of the first point
+                    columns = _reproject_columns(columns, zone_number, zone_letter)
+            file_columns.append(columns)
+        file_lengths = [len(columns["easting"]) for columns in file_columns]
+        if len(file_columns) == 1:
+            columns = file_columns[0]
+        else:
+            columns = {
+                name: _concatenate_columns([file[name] for file in file_columns])
+                for name in file_columns[0]
+            }
+        if csv_filename is not None:
+            output_path = str(config_file.get("output_path"))
+            _check_output_directory(output_path)
+            pd.DataFrame({name: columns[name] for name in column_names}).to_csv(
+                "{}/{}".format(output_path, csv_filename), index=False
+            )
+        file_index = np.repeat(np.arange(len(file_lengths)), file_lengths)
+        file_parameters = [
+            _select_parameters_by_index(config_file, n_file) for n_file in range(len(file_lengths))
+        ]
+        return cls(columns, file_index, file_parameters)
+
+    @classmethod
+    def from_dataframe(
+        cls, track_data: pd.DataFrame, config_file: Dict, file_lengths: List[int]
+    ) -> "_TrackStore":
+        """
+        Wrap tracks that were already concatenated
+        :param track_data: Concatenated tracks with UTM coordinates
+        :param config_file: Configuration with the `resources` of the tracks
+        :param file_lengths: Number of rows of each input file, in the order of
+            the resources (see _count_tracmap_rows)
+        :return: _TrackStore
+        """
+        columns = {name: _column_values(track_data[name]) for name in track_data.columns}
+        file_index = np.repeat(np.arange(len(file_lengths)), file_lengths)[: len(track_data)]
+        file_parameters = [
+            _select_parameters_by_index(config_file, n_file) for n_file in range(len(file_lengths))
+        ]
+        return cls(columns, file_index, file_parameters)
+
+    def __len__(self) -> int:
+        return len(self.file_index)
+
+    def __getitem__(self, column: str) -> np.ndarray:
+        return self.columns[column]
+
+    @property
+    def n_files(self) -> int:
+        return len(self.file_parameters)
+
+    @property
+    def file_lengths(self) -> np.ndarray:
+        return np.bincount(self.file_index, minlength=self.n_files)
+
+    def take(self, rows: np.ndarray) -> "_TrackStore":
+        """
+        :param rows: Boolean mask or indices of the rows to keep
+        :return: _TrackStore with the selected rows and the same file parameters
+        """
+        columns = {name: column[rows] for name, column in self.columns.items()}
+        return _TrackStore(columns, self.file_index[rows], self.file_parameters)
+
+    def to_dataframe(self) -> pd.DataFrame:
+        return pd.DataFrame(self.columns)
+
+
+def _first_point_zone(config_file: Dict) -> Tuple[int, str]:
+    first_point = pd.read_csv(
+        config_file["resources"][0]["input_data_path"],
+        header=None,
+        names=column_names,
+        usecols=[i for i in range(1, 9)],
+        nrows=1,
+    )
+    return (
+        int(zone_numbers(first_point.Lat.to_numpy(), first_point.Lon.to_numpy())[0]),
+        str(zone_letters(first_point.Lat.to_numpy())[0]),
+    )
+
+
+def _read_projected_columns(
+    tracmap_filename: str, zone_number: int, zone_letter: str
+) -> Dict[str, np.ndarray]:
+    track_data = _add_utm_columns(_read_tracmap(tracmap_filename), zone_number, zone_letter)
+    return {name: _column_values(track_data[name]) for name in track_data.columns}
+
+
+def _reproject_columns(
+    columns: Dict[str, np.ndarray], zone_number: int, zone_letter: str
+) -> Dict[str, np.ndarray]:
+    track_data = _add_utm_columns(
+        pd.DataFrame({name: columns[name] for name in columns if name not in utm_columns}),
+        zone_number,
+        zone_letter,
+    )
+    return {name: _column_values(track_data[name]) for name in columns}
@@ -0,0 +1,138 @@
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+import numpy as np
+import pandas as pd
+from nerd.io.geo2utm import _add_utm_columns
+from nerd.io.schema import _check_constraints
+from nerd.io.import_data import (
+    column_names,
+    tracmap_dtypes,
+    tracmap_fields,
+    _add_timestamp,
+    _column_values,
+    _concatenate_columns,
+    _select_parameters_by_index,
+)
+from nerd.io.track_store import _TrackStore
+
+# Rows shared with the neighbouring chunks: a tile uses the points before and two after its node
+N_PREVIOUS = 1
+N_NEXT = 2
+
+
+class _TrackChunk(NamedTuple):
+    """
+    Consecutive track points of a _TrackStream. The first `n_previous` and the last rows after
+    `n_previous + n_owned` are copies of the neighbouring chunks, so that every owned row can build
+    its tile. The first chunk has no previous rows.
+    """
+
+    tracks: _TrackStore
+    n_previous: int
+    n_owned: int
+
+
+class _TrackStream:
+    """
+    Helicopter tracks of every input file of a configuration, read in chunks of fixed size each time
+    the stream is iterated, so memory use does not grow with the length of the tracks.
+
+    Chunks are projected to the UTM zone of the first point of the stream. As with a _TrackStore,
+    the first point is its own previous point (see _cell_edges_slopes).
+
+    Attributes:
+    -----------
+    config_file : dict
+        Configuration with the `resources` to read.
+    chunk_size : int
+        Number of owned rows per chunk.
+    file_parameters : list
+        Aperture diameter (mm), swath width (m) and density function of each file, as returned by
+        `_select_parameters_by_index`.
+    """
+
+    def __init__(self, config_file: Dict, chunk_size: int = 100_000):
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be a positive integer")
+        self.config_file = config_file
+        self.chunk_size = chunk_size
+        self.file_parameters = [
+            _select_parameters_by_index(config_file, n_file)
+            for n_file in range(len(config_file["resources"]))
+        ]
+        self._bounds: Optional[Tuple[float, float, float, float]] = None
+
+    def __iter__(self) -> Iterator[_TrackChunk]:
+        return _iterate_track_chunks(self.config_file, self.chunk_size, self.file_parameters)
+
+    def bounds(self) -> Tuple[float, float, float, float]:
+        """
+        :return: Minimum and maximum easting and northing (m) of the tracks,
+            computed with one pass over the stream the first time
+        """
+        if self._bounds is None:
+            x_min, x_max, y_min, y_max = np.inf, -np.inf, np.inf, -np.inf
+            for chunk in self:
+                x = chunk.tracks["easting"]
+                y = chunk.tracks["northing"]
+                x_min, x_max = min(x_min, x.min()), max(x_max, x.max())
+                y_min, y_max = min(y_min, y.min()), max(y_max, y.max())
+            self._bounds = (x_min, x_max, y_min, y_max)
+        return self._bounds
+
+
+def _read_tracmap_chunks(tracmap_filename: str, chunk_size: int) -> Iterator[pd.DataFrame]:
+    with pd.read_csv(
+        tracmap_filename,
+        header=None,
+        names=column_names,
+        usecols=[i for i in range(1, 9)],
+        dtype=tracmap_dtypes,
+        chunksize=chunk_size,
+    ) as reader:
+        first_row = 0
+        for data in reader:
+            source = "{} (chunk from row {})".format(tracmap_filename, first_row)
+            _check_constraints(data, tracmap_fields, source)
+            first_row += len(data)
+            yield _add_timestamp(data)
+
+
+def _iterate_track_chunks(
+    config_file: Dict, chunk_size: int, file_parameters: List
+) -> Iterator[_TrackChunk]:
+    zone: Tuple[Optional[int], Optional[str]] = (None, None)
+    buffer: Dict[str, np.ndarray] = {}
+    n_previous = 0
+    for n_file, resources in enumerate(config_file["resources"]):
+        for data in _read_tracmap_chunks(resources["input_data_path"], chunk_size):
+            data = _add_utm_columns(data, *zone)
+            zone = (data["zone_number"].iloc[0], data["zone_letter"].iloc[0])
+            columns = {name: _column_values(data[name]) for name in data.columns}
+            columns["file_index"] = np.full(len(data), n_file, dtype=np.intp)
+            if buffer:
+                buffer = {
+                    name: _concatenate_columns([buffer[name], columns[name]]) for name in columns
+                }
+            else:
+                buffer = columns
+            while len(buffer["file_index"]) >= n_previous + chunk_size + N_NEXT:
+                n_rows = n_previous + chunk_size + N_NEXT
+                yield _make_chunk(buffer, n_rows, n_previous, chunk_size, file_parameters)
+                start = n_previous + chunk_size - N_PREVIOUS
+                buffer = {name: column[start:] for name, column in buffer.items()}
+                n_previous = N_PREVIOUS
+    if buffer and len(buffer["file_index"]) > n_previous:
+        n_rows = len(buffer["file_index"])
+        yield _make_chunk(buffer, n_rows, n_previous, n_rows - n_previous, file_parameters)
+
+
+def _make_chunk(
+    buffer: Dict[str, np.ndarray],
+    n_rows: int,
+    n_previous: int,
+    n_owned: int,
+    file_parameters: List,
+) -> _TrackChunk:
+    columns = {name: column[:n_rows] for name, column in buffer.items() if name != "file_index"}
+    tracks = _TrackStore(columns, buffer["file_index"][:n_rows], file_parameters)
+    return _TrackChunk(tracks, n_previous, n_owned)
@@ -11,6 +11,7 @@ from nerd.mapping.tiling import (  # noqa
     _calculate_cell_density_in_border,
     _density_in_tile,
     _is_inside_tile,
+    _grid_window,
     _calculate_directions,
     _generate_tile_direction_arrays,
     _sign_of_direction,
@@ -20,8 +21,9 @@ from nerd.mapping.tiling import (  # noqa
     _create_contour_polygon_list,
     _export_contour_list_as_shapefile,
     _generate_grid_density,
-    _Tracks,
+    _fit_track_parameters,
     _calculate_total_density,
+    _calculate_unit_flow_densities,
     _generate_uniform_density_array,
     _density_contours_intervals,
 )
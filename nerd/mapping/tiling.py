@@ -1,15 +1,16 @@
-import matplotlib
-from nerd import solver
-from nerd.io import _select_parameters_by_index, _create_df_list
-from nerd.density_functions import uniform
-from scipy.interpolate import griddata
-from shapely import geometry
-from tqdm import tqdm
-
-import fiona
-import matplotlib.pyplot as plt
+from functools import partial
+import copy
+from nerd import solve_batch
+from nerd.io import _count_tracmap_rows, _select_parameters_by_index, _TrackStore, _TrackStream
+from nerd.density_functions import uniform, as_density_function
+
 import numpy as np
-from typing import Tuple, List, Dict
+from typing import TYPE_CHECKING, Callable, Iterable, Tuple, List, Dict, Union
+
+# matplotlib, scipy, shapely, fiona and tqdm are imported by the functions that use them, so that
+# importing nerd does not load them
+if TYPE_CHECKING:
+    from matplotlib.contour import QuadContourSet
 
 
 def _slope_between_two_points(y2: float, y1: float, x2: float, x1: float) -> float:
@@ -27,9 +28,11 @@ def _safe_divition(numerator: float, denominator: float) -> float:
 
 
 def _cell_edges_slopes(x: np.ndarray, y: np.ndarray, node_index: int) -> tuple:
+    # The first point has no previous point, so it is its own
+    previous_index = max(node_index - 1, 0)
     start_slope = _orthogonal_slope(
         _slope_between_two_points(
-            y[node_index + 1], y[node_index - 1], x[node_index + 1], x[node_index - 1]
+            y[node_index + 1], y[previous_index], x[node_index + 1], x[previous_index]
         )
     )
     end_slope = _orthogonal_slope(
@@ -94,7 +97,9 @@ def _calculate_cell_density_in_border(x_rect: list, y_rect: list, n_point: int)
     return xx, yy
 
 
-def _density_in_tile(x_rect: list, y_rect: list, density_profile: np.floating, n_point: int):
+def _density_in_tile(x_rect: list, y_rect: list, density_profile: np.ndarray, n_point: int):
+    from scipy.interpolate import griddata
+
     xx, yy = _calculate_cell_density_in_border(x_rect, y_rect, n_point)
     mean_xx = np.mean(xx)
     mean_yy = np.mean(yy)
@@ -105,12 +110,44 @@ def _density_in_tile(x_rect: list, y_rect: list, density_profile: np.floating, n
     )
 
 
-def _is_inside_tile(x_rect: list, y_rect: list, points: np.ndarray) -> List[bool]:
+def _is_inside_tile(x_rect: list, y_rect: list, points: np.ndarray) -> np.ndarray:
+    from matplotlib.path import Path
+
     polygon_tile = [[x_rect[i], y_rect[i]] for i in range(len(x_rect))]
-    poly = matplotlib.path.Path(polygon_tile)
+    poly = Path(polygon_tile)
     return poly.contains_points(points)
 
 
+def _grid_window(
+    x_rect: list, y_rect: list, x_axis: np.ndarray, y_axis: np.ndarray
+) -> Tuple[slice, slice]:
+    """
+    Index window of a regular grid covered by the bounding box of a tile
+    :param x_rect: x coordinates (m) of the corners of the tile
+    :param y_rect: y coordinates (m) of the corners of the tile
+    :param x_axis: Increasing x coordinates (m) of the grid columns
+    :param y_axis: Increasing y coordinates (m) of the grid rows
+    :return: Slices of the rows and the columns of the grid nodes in the
+        bounding box, borders included (empty if the tile has no finite corner)
+    """
+    corners_x = np.asarray(x_rect, dtype=float)
+    corners_y = np.asarray(y_rect, dtype=float)
+    is_finite = np.isfinite(corners_x) & np.isfinite(corners_y)
+    if not is_finite.any():
+        return slice(0, 0), slice(0, 0)
+    # A point inside the tile is inside the bounding box of its finite corners
+    corners_x, corners_y = corners_x[is_finite], corners_y[is_finite]
+    columns = slice(
+        int(np.searchsorted(x_axis, corners_x.min(), side="left")),
+        int(np.searchsorted(x_axis, corners_x.max(), side="right")),
+    )
+    rows = slice(
+        int(np.searchsorted(y_axis, corners_y.min(), side="left")),
+        int(np.searchsorted(y_axis, corners_y.max(), side="right")),
+    )
+    return rows, columns
+
+
 def _calculate_directions(x_rect: list, y_rect: list) -> float:
     u, v = _generate_tile_direction_arrays(x_rect, y_rect)
     theta1 = _sign_of_direction(u, v)
@@ -148,14 +185,16 @@ def _check_directions(x_rect: list, y_rect: list) -> Tuple[list, list]:
 
 def _generate_contours(
     x_grid: np.ndarray, y_grid: np.ndarray, total_density: np.ndarray, *args
-) -> Tuple[matplotlib.contour.QuadContourSet, dict]:
+) -> Tuple["QuadContourSet", dict]:
+    import matplotlib.pyplot as plt
+
     contour = plt.contourf(x_grid, y_grid, total_density, *args)
     return contour, dict(zip(contour.collections, contour.levels))
 
 
-def _create_contour_polygon_list(
-    contour: matplotlib.contour.QuadContourSet, contour_dict: dict
-) -> list:
+def _create_contour_polygon_list(contour: "QuadContourSet", contour_dict: dict) -> list:
+    from shapely import geometry
+
     # Original code in https://github.com/chrishavlin/learning_shapefiles/blob/master/src/contourf_to_shp.py
     PolyList = []
     for col in contour.collections:
@@ -175,6 +214,9 @@ def _create_contour_polygon_list(
 
 
 def _export_contour_list_as_shapefile(PolyList: List[Dict], output_path: str) -> None:
+    import fiona
+    from shapely import geometry
+
     schema = {"geometry": "Polygon", "properties": {"z": "float"}}
     with fiona.collection(output_path, "w", "ESRI Shapefile", schema) as output:
         for poly_list in PolyList:
@@ -192,29 +234,39 @@ def _generate_grid_density(
     return x_grid, y_grid
 
 
-class _Tracks:
-    def __init__(self, track_data):
-        self.track_data = track_data
-
-    @property
-    def _x_coordinates(self) -> np.ndarray:
-        return self.track_data["easting"].to_numpy()
-
-    @property
-    def _y_coordinates(self) -> np.ndarray:
-        return self.track_data["northing"].to_numpy()
-
-    @property
-    def _bucket_logger(self) -> np.ndarray:
-        return self.track_data["Logging_on"].to_numpy()
-
-    @property
-    def _helicopter_speed(self) -> np.ndarray:
-        return self.track_data["Speed"].to_numpy()
-
-    @property
-    def _n_data(self) -> int:
-        return len(self.track_data)
+def _as_track_store(track_data, config_file) -> Union[_TrackStore, _TrackStream]:
+    if isinstance(track_data, (_TrackStore, _TrackStream)):
+        return track_data
+    return _track_store_from_dataframe(track_data, config_file)
+
+
+def _track_store_from_dataframe(track_data, config_file) -> _TrackStore:
+    # Only the rows of the input files are counted, to find the file of each row of the frame
+    file_lengths = [
+        _count_tracmap_rows(resource["input_data_path"]) for resource in config_file["resources"]
+    ]
+    return _TrackStore.from_dataframe(track_data, config_file, file_lengths)
+
+
+def _fit_track_parameters(
+    helicopter_speed: np.ndarray,
+    is_dispersing: np.ndarray,
+    file_index: np.ndarray,
+    file_parameters: list,
+    flow_rate_function: Callable,
+) -> np.ndarray:
+    parameters = np.full(len(helicopter_speed), np.nan)
+    for n_file in np.unique(file_index[is_dispersing]):
+        aperture_diameter, swap_width, density_function = file_parameters[n_file]
+        is_in_file = is_dispersing & (file_index == n_file)
+        parameters[is_in_file] = solve_batch(
+            aperture_diameter,
+            helicopter_speed[is_in_file],
+            swap_width,
+            density_function,
+            flow_rate_function,
+        )
+    return parameters
 
 
 def _calculate_total_density(
@@ -230,6 +282,11 @@ def _calculate_total_density(
     a spatial grid. The process involves selecting parameters for each segment of the tracks, solving the density
     function, and summing up the density values within the corresponding grid cells.
 
+    `track_data` is a `_TrackStore`, which carries the source file and parameters of every row, a
+    `_TrackStream`, which reads the tracks in chunks so that memory use is bounded by the chunk size
+    and the grid, or a DataFrame of concatenated tracks, in which case the rows of the input files
+    are counted to find them.
+
     Returns:
     --------
     Tuple[np.ndarray, np.ndarray, np.ndarray]
@@ -240,50 +297,161 @@ def _calculate_total_density(
         - total_density_grid : np.ndarray
             The calculated total density distribution over the grid.
     """
-    tracks = _Tracks(track_data)
-    x_grid, y_grid = _generate_grid_density(
-        tracks._x_coordinates, tracks._y_coordinates, spatial_resolution
-    )
-    df_list = _create_df_list(config_file)
-    datafiles_lenghts = np.cumsum([len(df) for df in df_list])
-    n_file = 0
-    aperture_diameter, swap_width, density_function = _select_parameters_by_index(
-        config_file, n_file
-    )
-    x_grid_ravel = np.ravel(x_grid)
-    y_grid_ravel = np.ravel(y_grid)
-    total_density = np.zeros_like(x_grid_ravel)
+    from tqdm import tqdm
+
+    if isinstance(track_data, _TrackStream):
+        x_min, x_max, y_min, y_max = track_data.bounds()
+        x_grid, y_grid = _generate_grid_density(
+            np.array([x_min, x_max]), np.array([y_min, y_max]), spatial_resolution
+        )
+        file_parameters = track_data.file_parameters
+    else:
+        tracks = (
+            track_data
+            if isinstance(track_data, _TrackStore)
+            else _track_store_from_dataframe(track_data, config_file)
+        )
+        x_grid, y_grid = _generate_grid_density(
+            tracks["easting"], tracks["northing"], spatial_resolution
+        )
+        file_parameters = tracks.file_parameters
+    aperture_diameter, swap_width, density_function = file_parameters[0]
+    total_density = np.zeros_like(x_grid)
     n = int(np.floor(swap_width / spatial_resolution))
     array_for_density = np.linspace(-swap_width / 2, swap_width / 2, n)
-    for i in tqdm(range(tracks._n_data - 2)):
-        if tracks._bucket_logger[i] == 0:
+    add_tile_densities = partial(
+        _add_tile_densities,
+        total_density=total_density,
+        x_axis=x_grid[0],
+        y_axis=y_grid[:, 0],
+        flow_rate_function=flow_rate_function,
+        array_for_density=array_for_density,
+    )
+    if isinstance(track_data, _TrackStream):
+        for chunk in tqdm(track_data, unit="chunk"):
+            last_row = min(chunk.n_previous + chunk.n_owned, len(chunk.tracks) - 2)
+            add_tile_densities(chunk.tracks, range(chunk.n_previous, last_row))
+    else:
+        add_tile_densities(tracks, tqdm(range(len(tracks) - 2)))
+    return x_grid, y_grid, total_density
+
+
+def _add_tile_densities(
+    tracks: _TrackStore,
+    rows: Iterable[int],
+    total_density: np.ndarray,
+    x_axis: np.ndarray,
+    y_axis: np.ndarray,
+    flow_rate_function: Callable,
+    array_for_density: np.ndarray,
+) -> None:
+    # total_density is the grid of x_axis by y_axis (one row per y). Each tile only tests and
+    # updates the window of the grid inside its bounding box
+    x_coordinates = tracks["easting"]
+    y_coordinates = tracks["northing"]
+    helicopter_speed = tracks["Speed"]
+    file_parameters = tracks.file_parameters
+    file_index = tracks.file_index
+    n = len(array_for_density)
+    density_array = np.empty_like(array_for_density)
+    density_profiles = [
+        as_density_function(density_function) for _, _, density_function in file_parameters
+    ]
+    is_dispersing = (tracks["Logging_on"] != 0) & (helicopter_speed != 0)
+    parameters = _fit_track_parameters(
+        helicopter_speed, is_dispersing, file_index, file_parameters, flow_rate_function
+    )
+    for i in rows:
+        if not is_dispersing[i]:
             continue
         else:
-            if i >= datafiles_lenghts[n_file]:
-                n_file += 1
-            aperture_diameter, swap_width, density_function = _select_parameters_by_index(
-                config_file, n_file
-            )
-            density_function_lambda = solver(
-                aperture_diameter,
-                tracks._helicopter_speed[i],
-                swap_width,
-                density_function,
-                flow_rate_function,
+            aperture_diameter, swap_width, density_function = file_parameters[file_index[i]]
+            density_profile = density_profiles[file_index[i]]
+            # Linear profiles scale their cached unit profile into the buffer
+            density_profile.evaluate(
+                array_for_density, swap_width, parameters[i], out=density_array
             )
-            density_array = density_function_lambda(array_for_density)
             x_rect, y_rect = _generate_cell_from_coordinates(
-                tracks._x_coordinates, tracks._y_coordinates, i, swap_width
+                x_coordinates, y_coordinates, i, swap_width
             )
-            inside_mask = _is_inside_tile(x_rect, y_rect, np.array([x_grid_ravel, y_grid_ravel]).T)
-            sub_grid_x = x_grid_ravel[inside_mask]
-            sub_grid_y = y_grid_ravel[inside_mask]
+            rows_window, columns_window = _grid_window(x_rect, y_rect, x_axis, y_axis)
+            window_x, window_y = np.meshgrid(x_axis[columns_window], y_axis[rows_window])
+            if window_x.size == 0:
+                continue
+            inside_mask = _is_inside_tile(
+                x_rect, y_rect, np.column_stack([window_x.ravel(), window_y.ravel()])
+            ).reshape(window_x.shape)
             cell_density = _density_in_tile(x_rect, y_rect, density_array, n)(
-                sub_grid_x, sub_grid_y
+                window_x[inside_mask], window_y[inside_mask]
             )
-            total_density[inside_mask] = total_density[inside_mask] + cell_density
-    total_density_grid = np.reshape(total_density, x_grid.shape)
-    return x_grid, y_grid, total_density_grid
+            density_window = total_density[rows_window, columns_window]
+            density_window[inside_mask] = density_window[inside_mask] + cell_density
+
+
+def _calculate_unit_flow_densities(
+    track_data,
+    config_file,
+    spatial_resolution,
+    swath_width_offset: float = 0.0,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Calculate one density map per aperture diameter in the configuration, with a flow rate of
+    1 kg/s through that aperture and 0 kg/s through the rest.
+
+    With density profiles that are linear in their free parameter, the total density for any flow
+    rate function is the sum of these maps weighted by the flow rate of each aperture.
+    `swath_width_offset` (m) is added to the swath width of every file, to build the maps of a
+    group of swath widths.
+
+    Returns:
+    --------
+    Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]
+        - x_grid : np.ndarray
+            The x-coordinates of the grid.
+        - y_grid : np.ndarray
+            The y-coordinates of the grid.
+        - aperture_diameters : np.ndarray
+            The distinct aperture diameters, one per map.
+        - unit_flow_densities : np.ndarray
+            The density maps stacked along the first axis.
+    """
+    resources = config_file["resources"]
+    for n_file in range(len(resources)):
+        _, swap_width, density_function = _select_parameters_by_index(config_file, n_file)
+        if not as_density_function(density_function).is_linear(swap_width):
+            raise ValueError(
+                "Unit flow maps require density functions that are linear in their free parameter"
+            )
+    aperture_diameters = np.unique([resource["aperture_diameter"] for resource in resources])
+    tracks = _as_track_store(track_data, config_file)
+    if swath_width_offset != 0:
+        tracks = _offset_swath_widths(tracks, swath_width_offset)
+    unit_flow_densities = []
+    for aperture_diameter in aperture_diameters:
+        x_grid, y_grid, density = _calculate_total_density(
+            tracks,
+            config_file,
+            spatial_resolution,
+            partial(_unit_flow_rate, selected_aperture_diameter=aperture_diameter),
+        )
+        unit_flow_densities.append(density)
+    return x_grid, y_grid, aperture_diameters, np.array(unit_flow_densities)
+
+
+def _offset_swath_widths(
+    tracks: Union[_TrackStore, _TrackStream], swath_width_offset: float
+) -> Union[_TrackStore, _TrackStream]:
+    # The columns (or the files of a stream) are shared, only the file parameters change
+    offset_tracks = copy.copy(tracks)
+    offset_tracks.file_parameters = [
+        (aperture_diameter, swap_width + swath_width_offset, density_function)
+        for aperture_diameter, swap_width, density_function in tracks.file_parameters
+    ]
+    return offset_tracks
+
+
+def _unit_flow_rate(aperture_diameter: np.ndarray, selected_aperture_diameter: float) -> np.ndarray:
+    return np.where(aperture_diameter == selected_aperture_diameter, 1.0, 0.0)
 
 
 def _generate_uniform_density_array(
@@ -1,6 +1,7 @@
-from typing import Callable
-from scipy.integrate import quad
-from scipy.optimize import fsolve
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Optional, Union
+from nerd.density_functions import as_density_function
 import numpy as np
 
 
@@ -10,6 +11,8 @@ def solver(
     swath_width: float,
     density_function: Callable,
     flow_rate_function: Callable,
+    cache: Optional["SolverCache"] = None,
+    starting_parameter: Optional[float] = None,
 ) -> Callable:
     """
     Fit model for bait density as a function of perpendicular distance in meters
@@ -23,18 +26,273 @@ def solver(
         factor
     :param flow_rate_function: Function of mass flow rate (kg/s) with respect to
         aperture diameter (mm)
+    :param cache: Optional SolverCache used to reuse previously fitted parameters
+    :param starting_parameter: Optional initial guess for the free parameter
+        (e.g. the one fitted for the previous segment) when it has to be found
+        numerically. With a cache, it is only used when the parameter is not
+        cached yet
     :return: Function for bait density (kg/m^2) profile with respect to
         perpendicular distance (m) from flight path
     """
+    if cache is None:
+        parametro_ajustado = _fit_parameter(
+            aperture_diameter,
+            helicopter_speed,
+            swath_width,
+            density_function,
+            flow_rate_function,
+            starting_parameter,
+        )
+    else:
+        parametro_ajustado = cache.fit_parameter(
+            aperture_diameter,
+            helicopter_speed,
+            swath_width,
+            density_function,
+            flow_rate_function,
+            starting_parameter,
+        )
+    return lambda x: density_function(x, swath_width, parametro_ajustado)
+
+
+def solve_batch(
+    aperture_diameters: Union[float, np.ndarray],
+    helicopter_speeds: Union[float, np.ndarray],
+    swath_widths: Union[float, np.ndarray],
+    density_function: Callable,
+    flow_rate_function: Callable,
+    n_workers: Optional[int] = None,
+) -> np.ndarray:
+    """
+    Fit the free parameter of the density profile for arrays of aperture
+        diameters, helicopter speeds and swath widths
+    :param aperture_diameters: Diameters (mm) of the dispersion bucket aperture
+    :param helicopter_speeds: Speeds (m/s) of the helicopter during dispersion
+        of bait
+    :param swath_widths: Widths (m) of dispersion swath
+    :param density_function: Function for density (kg/m^2) profile with respect
+        to perpendicular distance (m) to flight path, swath width (m), and scale
+        factor
+    :param flow_rate_function: Function of mass flow rate (kg/s) with respect to
+        aperture diameter (mm)
+    :param n_workers: Number of worker processes used to root-find the
+        parameters of density functions that can not be solved in closed form
+        (the density function must be picklable). Serial if None
+    :return: Array of fitted free parameters with the broadcast shape of the
+        inputs
+    """
+    aperture_diameters, helicopter_speeds, swath_widths = np.broadcast_arrays(
+        np.asarray(aperture_diameters, dtype=float),
+        np.asarray(helicopter_speeds, dtype=float),
+        np.asarray(swath_widths, dtype=float),
+    )
+    mass_per_meter = flow_rate_function(aperture_diameters) / helicopter_speeds
+    return _solve_batch_from_mass(mass_per_meter, swath_widths, density_function, n_workers)
+
+
+def _solve_batch_from_mass(
+    mass_per_meter: np.ndarray,
+    swath_widths: np.ndarray,
+    density_function: Callable,
+    n_workers: Optional[int] = None,
+) -> np.ndarray:
+    mass_per_meter, swath_widths = np.broadcast_arrays(
+        np.asarray(mass_per_meter, dtype=float), np.asarray(swath_widths, dtype=float)
+    )
+    unit_integrals = as_density_function(density_function).integrate_unit_profile(swath_widths)
+    if unit_integrals is not None:
+        return mass_per_meter / unit_integrals
+    unique_inputs, inverse = np.unique(
+        np.stack([np.ravel(mass_per_meter), np.ravel(swath_widths)], axis=-1),
+        axis=0,
+        return_inverse=True,
+    )
+    if n_workers is None or n_workers < 2 or len(unique_inputs) < 2:
+        parameters = _fit_parameters_numerically(unique_inputs, density_function)
+    else:
+        chunks = np.array_split(unique_inputs, min(n_workers, len(unique_inputs)))
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            parameters = np.concatenate(
+                list(
+                    executor.map(
+                        _fit_parameters_numerically, chunks, [density_function] * len(chunks)
+                    )
+                )
+            )
+    return parameters[np.ravel(inverse)].reshape(mass_per_meter.shape)
+
+
+def _fit_parameters_numerically(inputs: np.ndarray, density_function: Callable) -> np.ndarray:
+    parameters = np.zeros(len(inputs))
+    starting_parameter = None
+    for i_input, (mass, width) in enumerate(inputs):
+        # Inputs are sorted, so the previous solution is a close starting point
+        parameters[i_input] = _fit_parameter_numerically(
+            mass, width, density_function, starting_parameter
+        )
+        starting_parameter = parameters[i_input]
+    return parameters
+
+
+def evaluate_profiles(
+    distance: Union[float, np.ndarray],
+    swath_widths: Union[float, np.ndarray],
+    parameters: Union[float, np.ndarray],
+    density_function: Callable,
+) -> np.ndarray:
+    """
+    Evaluate many fitted density profiles at once
+    :param distance: Perpendicular distance in meters (m) from flight path
+    :param swath_widths: Widths (m) of dispersion swath, one per profile
+    :param parameters: Fitted free parameters, one per profile (see solve_batch)
+    :param density_function: Function for density (kg/m^2) profile with respect
+        to perpendicular distance (m) to flight path, swath width (m), and scale
+        factor
+    :return: Density (kg/m^2) array with shape parameters.shape + distance.shape
+    """
+    distance = np.asarray(distance, dtype=float)
+    swath_widths, parameters = np.broadcast_arrays(
+        np.asarray(swath_widths, dtype=float), np.asarray(parameters, dtype=float)
+    )
+    expand = (...,) + (np.newaxis,) * distance.ndim
+    density = density_function(distance, swath_widths[expand], parameters[expand])
+    return np.broadcast_to(density, parameters.shape + distance.shape)
+
+
+def _fit_parameter(
+    aperture_diameter: float,
+    helicopter_speed: float,
+    swath_width: float,
+    density_function: Callable,
+    flow_rate_function: Callable,
+    starting_parameter: Optional[float] = None,
+) -> float:
+    mass_per_meter = flow_rate_function(aperture_diameter) / helicopter_speed
+    return _fit_parameter_from_mass(
+        mass_per_meter, swath_width, density_function, starting_parameter
+    )
+
+
+def _fit_parameter_from_mass(
+    mass_per_meter: float,
+    swath_width: float,
+    density_function: Callable,
+    starting_parameter: Optional[float] = None,
+) -> float:
+    unit_integral = as_density_function(density_function).integrate_unit_profile(swath_width)
+    if unit_integral is not None:
+        return float(mass_per_meter / unit_integral)
+    return _fit_parameter_numerically(
+        mass_per_meter, swath_width, density_function, starting_parameter
+    )
+
+
+def _fit_parameter_numerically(
+    mass_per_meter: float,
+    swath_width: float,
+    density_function: Callable,
+    starting_parameter: Optional[float] = None,
+) -> float:
+    # scipy is only needed by user-supplied density functions, so it is imported on first use
+    from scipy.integrate import quad
+    from scipy.optimize import fsolve
+
+    integrations_limits = swath_width / 2
+
+    def integrate(integrand: Callable) -> float:
+        return quad(integrand, -integrations_limits, integrations_limits)[0]
 
     def mass_conservation(parametro_libre):
-        def sigma(distance):
-            return density_function(distance, swath_width, parametro_libre)
+        return [
+            integrate(lambda x: density_function(x, swath_width, parametro_libre[0]))
+            - mass_per_meter
+        ]
 
-        integrations_limits = swath_width / 2
-        integral = quad(sigma, -integrations_limits, integrations_limits)[0]
-        return integral - flow_rate_function(aperture_diameter) / helicopter_speed
+    if starting_parameter is None or not np.isfinite(starting_parameter):
+        # Parameter of a uniform profile that carries the same mass
+        starting_parameter = mass_per_meter / swath_width
+    parameter_derivative = as_density_function(density_function).parameter_derivative
+    if parameter_derivative is None:
+        return fsolve(mass_conservation, [starting_parameter])[0]
 
-    starting_root = np.random.rand()
-    parametro_ajustado = fsolve(mass_conservation, starting_root)[0]
-    return lambda x: density_function(x, swath_width, parametro_ajustado)
+    def mass_conservation_derivative(parametro_libre):
+        # Derivative under the integral sign
+        return [[integrate(lambda x: parameter_derivative(x, swath_width, parametro_libre[0]))]]
+
+    return fsolve(mass_conservation, [starting_parameter], fprime=mass_conservation_derivative)[0]
+
+
+class SolverCache:
+    """
+    Least recently used cache of the free parameters fitted by `solver`
+
+    Attributes:
+    -----------
+    max_size : int
+        Maximum number of fitted parameters kept in the cache.
+    speed_resolution : float or None
+        If given, helicopter speeds (m/s) are rounded to multiples of this value before solving,
+        so that nearby speeds share one entry.
+    hits : int
+        Number of calls answered from the cache.
+    misses : int
+        Number of calls that required a new fit.
+    """
+
+    def __init__(self, max_size: int = 4096, speed_resolution: Optional[float] = None):
+        if max_size < 1:
+            raise ValueError("max_size must be a positive integer")
+        self.max_size = max_size
+        self.speed_resolution = speed_resolution
+        self.hits = 0
+        self.misses = 0
+        self._parameters: OrderedDict = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._parameters)
+
+    def clear(self) -> None:
+        self._parameters.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def fit_parameter(
+        self,
+        aperture_diameter: float,
+        helicopter_speed: float,
+        swath_width: float,
+        density_function: Callable,
+        flow_rate_function: Callable,
+        starting_parameter: Optional[float] = None,
+    ) -> float:
+        helicopter_speed = self._quantize_speed(helicopter_speed)
+        # The flow rate function is kept alive by its entry, so its id can not be reused.
+        key = (
+            aperture_diameter,
+            helicopter_speed,
+            swath_width,
+            density_function,
+            id(flow_rate_function),
+        )
+        if key in self._parameters:
+            self.hits += 1
+            self._parameters.move_to_end(key)
+            return self._parameters[key][0]
+        self.misses += 1
+        parameter = _fit_parameter(
+            aperture_diameter,
+            helicopter_speed,
+            swath_width,
+            density_function,
+            flow_rate_function,
+            starting_parameter,
+        )
+        self._parameters[key] = (parameter, flow_rate_function)
+        if len(self._parameters) > self.max_size:
+            self._parameters.popitem(last=False)
+        return parameter
+
+    def _quantize_speed(self, helicopter_speed: float) -> float:
+        if self.speed_resolution is None:
+            return helicopter_speed
+        return round(helicopter_speed / self.speed_resolution) * self.speed_resolution
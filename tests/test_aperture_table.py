@@ -0,0 +1,60 @@
+import numpy as np
+import os
+import tempfile
+from unittest import TestCase
+from nerd.calibration import ApertureTable, model
+from nerd.density_functions import normal
+
+
+class TestApertureTable(TestCase):
+    def setUp(self) -> None:
+        self.swath_width = 60
+        self.flow_rate_function = np.poly1d([0.0007, -0.06, 1.7])
+        self.table = ApertureTable.from_model(
+            np.linspace(50, 100, 51),
+            np.linspace(10, 40, 7),
+            self.swath_width,
+            normal,
+            self.flow_rate_function,
+        )
+
+    def nadir_density(self, aperture_diameter, helicopter_speed):
+        return model(
+            [aperture_diameter],
+            [helicopter_speed],
+            self.swath_width,
+            normal,
+            self.flow_rate_function,
+        )[0, 0]
+
+    def test_recommend_aperture(self):
+        target_density = 8 / 1e4  # 8 kg/ha
+        helicopter_speed = 27.3
+        aperture_diameter = self.table.recommend_aperture(target_density, helicopter_speed)
+        self.assertAlmostEqual(
+            self.nadir_density(aperture_diameter, helicopter_speed), target_density, places=6
+        )
+
+    def test_batch_queries(self):
+        speeds = np.array([[12.0, 20.0, 33.3]])
+        obtained = self.table.recommend_aperture(15 / 1e4, speeds)
+        assert obtained.shape == (1, 3)
+        assert np.all(np.diff(obtained) > 0)
+
+    def test_outside_of_table(self):
+        obtained = self.table.recommend_aperture([1.0, 6 / 1e4, 6 / 1e4], [20, 5, 45])
+        assert np.isnan(obtained).all()
+
+    def test_nadir_density_at(self):
+        obtained = self.table.nadir_density_at(75.5, 23)
+        self.assertAlmostEqual(obtained, self.nadir_density(75.5, 23), places=6)
+
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "aperture_table.npz")
+            self.table.save(path)
+            loaded = ApertureTable.load(path)
+        np.testing.assert_array_equal(loaded.nadir_density, self.table.nadir_density)
+        self.assertEqual(
+            loaded.recommend_aperture(0.0008, 30), self.table.recommend_aperture(0.0008, 30)
+        )
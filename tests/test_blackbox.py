@@ -1,6 +1,7 @@
 import numpy as np
 import pandas as pd
 import pytest
+import scipy.integrate
 
 import nerd
 
@@ -155,3 +156,177 @@ def test_solver(aperture_diameter, helicopter_speed, swath_width, flow_rate_func
     evaluated_function_expected = 0.0012678106357132415
     evaluated_function_obtained = fitted_function(distance)
     np.testing.assert_almost_equal(evaluated_function_obtained, evaluated_function_expected)
+
+
+def test_density_functions_rmse(distance, density, swath_width, flow_rate_function):
+    aperture_diameter_data = 55  # Milimetres
+    helicopter_speed_data = 20.5778  # Meters per second (40 knots)
+    serial_rmse = nerd.calibration.get_density_functions_rmse(
+        distance,
+        density,
+        aperture_diameter_data,
+        helicopter_speed_data,
+        swath_width,
+        flow_rate_function,
+    )
+    assert list(serial_rmse.density_function) == ["normal", "triangular", "uniform"]
+    expected_rmse = [
+        nerd.calibration._get_rmse(
+            distance,
+            density,
+            aperture_diameter_data,
+            helicopter_speed_data,
+            swath_width,
+            density_function,
+            flow_rate_function,
+        )
+        for density_function in [
+            nerd.density_functions.normal,
+            nerd.density_functions.triangular,
+            nerd.density_functions.uniform,
+        ]
+    ]
+    np.testing.assert_allclose(serial_rmse.rmse, expected_rmse)
+    for executor in ["thread", "process"]:
+        concurrent_rmse = nerd.calibration.get_density_functions_rmse(
+            distance,
+            density,
+            aperture_diameter_data,
+            helicopter_speed_data,
+            swath_width,
+            flow_rate_function,
+            n_workers=2,
+            executor=executor,
+        )
+        pd.testing.assert_frame_equal(concurrent_rmse, serial_rmse)
+    with pytest.raises(ValueError):
+        nerd.calibration.get_density_functions_rmse(
+            distance,
+            density,
+            aperture_diameter_data,
+            helicopter_speed_data,
+            swath_width,
+            flow_rate_function,
+            executor="fork",
+        )
+
+
+def test_fit_swath_width_and_density_function(distance, density, flow_rate_function):
+    aperture_diameter_data = 55  # Milimetres
+    helicopter_speed_data = 20.5778  # Meters per second (40 knots)
+    swath_widths = np.array([40, 50, 60, 70])
+    swath_width, density_function, rmse_surface = (
+        nerd.calibration.fit_swath_width_and_density_function(
+            distance,
+            density,
+            aperture_diameter_data,
+            helicopter_speed_data,
+            flow_rate_function,
+            swath_widths,
+        )
+    )
+    assert rmse_surface.shape == (4, 3)
+    assert list(rmse_surface.columns) == ["normal", "triangular", "uniform"]
+    expected_rmse = nerd.calibration._get_rmse(
+        distance,
+        density,
+        aperture_diameter_data,
+        helicopter_speed_data,
+        50,
+        nerd.density_functions.triangular,
+        flow_rate_function,
+    )
+    np.testing.assert_allclose(rmse_surface.loc[50, "triangular"], expected_rmse)
+    assert rmse_surface.loc[swath_width, density_function.__name__] == rmse_surface.min().min()
+
+
+def test_calibrate_trials(density_profile, flow_rate_function):
+    trial_settings = [("a", 55, 20.5778), ("b", 75, 25), ("c", 90, 30)]
+    trials = pd.concat(
+        [
+            pd.DataFrame(
+                {
+                    "trial": trial,
+                    "distance": density_profile.distance,
+                    "density": density_profile.density / 1e4,
+                    "aperture_diameter": aperture_diameter,
+                    "helicopter_speed": helicopter_speed,
+                }
+            )
+            for trial, aperture_diameter, helicopter_speed in trial_settings
+        ]
+    )
+    calibration = nerd.calibration.calibrate_trials(trials, flow_rate_function)
+    assert list(calibration.trial) == ["a", "b", "c"]
+    np.testing.assert_allclose(calibration.swath_width, 64.64625)
+    expected_function = nerd.calibration.get_best_density_function(
+        density_profile.distance.values,
+        density_profile.density.values / 1e4,
+        55,
+        20.5778,
+        64.64625,
+        flow_rate_function,
+    )
+    assert calibration.density_function[0] == expected_function.__name__
+    parallel_calibration = nerd.calibration.calibrate_trials(
+        trials, flow_rate_function, n_workers=2
+    )
+    pd.testing.assert_frame_equal(parallel_calibration, calibration)
+    # The swath width of get_swath_width is a candidate, so the joint search cannot do worse
+    swath_widths = np.array([50, 60, calibration.swath_width[0], 70])
+    joint_calibration = nerd.calibration.calibrate_trials(
+        trials, flow_rate_function, swath_widths=swath_widths
+    )
+    assert set(joint_calibration.swath_width) <= set(swath_widths)
+    assert (joint_calibration.rmse <= calibration.rmse * (1 + 1e-6)).all()
+    spread_calibration = nerd.calibration.calibrate_trials(
+        trials, flow_rate_function, fit_spread=True
+    )
+    assert (spread_calibration.normal_spread > 0).all()
+    pd.testing.assert_frame_equal(spread_calibration[calibration.columns], calibration)
+
+
+def test_fit_normal_spread(
+    distance, density, aperture_diameter, helicopter_speed, swath_width, flow_rate_function
+):
+    spread, density_function, rmse = nerd.calibration.fit_normal_spread(
+        distance, density, aperture_diameter, helicopter_speed, swath_width, flow_rate_function
+    )
+    assert spread > 0
+    fitted_profile = nerd.solver(
+        aperture_diameter, helicopter_speed, swath_width, density_function, flow_rate_function
+    )
+    mass_per_meter = flow_rate_function(aperture_diameter) / helicopter_speed
+    mass = scipy.integrate.quad(fitted_profile, -swath_width / 2, swath_width / 2)[0]
+    np.testing.assert_allclose(mass, mass_per_meter)
+    np.testing.assert_allclose(
+        np.sqrt(np.mean((fitted_profile(distance) - density) ** 2)), rmse, rtol=1e-6
+    )
+    normal_rmse = nerd.calibration._get_rmse(
+        distance,
+        density,
+        aperture_diameter,
+        helicopter_speed,
+        swath_width,
+        nerd.density_functions.normal,
+        flow_rate_function,
+    )
+    assert rmse <= normal_rmse
+    # The fitted profile takes arrays of swath widths, as every density function
+    nadir_density = nerd.calibration.model(
+        np.array([aperture_diameter, aperture_diameter + 10]),
+        np.array([helicopter_speed, helicopter_speed + 5]),
+        swath_width,
+        density_function,
+        flow_rate_function,
+    )
+    assert nadir_density.shape == (2, 2)
+    swath_widths = np.array([swath_width, swath_width + 10])
+    parameters = nerd.solve_batch(
+        aperture_diameter, helicopter_speed, swath_widths, density_function, flow_rate_function
+    )
+    for parameter, width in zip(parameters, swath_widths):
+        profile = nerd.solver(
+            aperture_diameter, helicopter_speed, width, density_function, flow_rate_function
+        )
+        np.testing.assert_allclose(density_function(distance, width, parameter), profile(distance))
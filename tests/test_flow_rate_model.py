@@ -0,0 +1,61 @@
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from nerd.calibration import FlowRateModel, fit_flow_rate, fit_flow_rate_covariance
+from nerd.io import _import_flow_rate_model
+
+
+@pytest.fixture()
+def flow_data():
+    return pd.read_csv("tests/data/flow.csv")
+
+
+def test_fit_matches_polyfit_per_group(flow_data):
+    model = FlowRateModel.from_dataframe(flow_data, group_column="bait_status")
+    assert list(model.groups) == sorted(flow_data.bait_status.unique())
+    for group, data in flow_data.groupby("bait_status"):
+        expected = fit_flow_rate(data.aperture, data.flow)
+        np.testing.assert_allclose(model.poly1d(group).coeffs, expected.coeffs)
+        np.testing.assert_allclose(
+            model.covariance(group), fit_flow_rate_covariance(data.aperture, data.flow)
+        )
+        residuals = data.flow - expected(data.aperture)
+        np.testing.assert_allclose(
+            model.residual_standard_deviation[model.group_index(group)],
+            np.sqrt((residuals**2).sum() / (len(data) - 3)),
+        )
+
+
+def test_evaluate_groups(flow_data):
+    model = FlowRateModel.from_dataframe(flow_data, group_column="bait_status")
+    apertures = flow_data.aperture.to_numpy()
+    expected = [
+        model.poly1d(group)(aperture) for aperture, group in zip(apertures, flow_data.bait_status)
+    ]
+    np.testing.assert_allclose(model(apertures, flow_data.bait_status.to_numpy()), expected)
+    np.testing.assert_allclose(model(apertures, "new"), model.poly1d("new")(apertures))
+    with pytest.raises(ValueError):
+        model(apertures)
+    with pytest.raises(ValueError):
+        model(apertures, "broken")
+
+
+def test_single_group_is_default(flow_data):
+    model = FlowRateModel.fit(flow_data.aperture, flow_data.flow)
+    np.testing.assert_allclose(
+        model(np.array([60, 80])), fit_flow_rate(flow_data.aperture, flow_data.flow)([60, 80])
+    )
+
+
+def test_pickle(flow_data):
+    model = FlowRateModel.from_dataframe(flow_data, group_column="bait_status", default_group="new")
+    unpickled = pickle.loads(pickle.dumps(model))
+    np.testing.assert_array_equal(unpickled(np.arange(50, 100)), model(np.arange(50, 100)))
+
+
+def test_import_flow_rate_model():
+    model = _import_flow_rate_model("tests/data/flow.csv", "bait_status")
+    assert set(model.groups) == {"new", "reused"}
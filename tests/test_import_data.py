@@ -17,6 +17,9 @@ from nerd.io.import_data import (
     _import_multifile_tracmap,
     _create_df_list,
     _select_parameters_by_index,
+    _read_tracmap,
+    _tracmap_timestamps,
+    tracmap_dtypes,
 )
 
 
@@ -34,7 +37,7 @@ def test_import_tracmap_without_csvfilename():
     expected_utm_data = pd.read_csv("tests/data/expected_utm_data.csv")
     obtained_utm_data = _import_tracmap(tracmap_filename="tests/data/tracmap_sample_data.txt")
     assert_frame_equal(expected_utm_data, obtained_utm_data)
-    os.remove("input_data.csv")
+    assert not os.path.isfile("input_data.csv")
 
 
 def test_import_tracmap_with_csvfilename():
@@ -72,10 +75,19 @@ def test_check_output_directory():
 def test_import_multifile_tracmap():
     config_file_path = "tests/data/expected_nerd_config.json"
     config_file = pd.read_json(config_file_path, typ="series")
-    tracmap_data = _import_multifile_tracmap(config_file, "input_concatenated_data.csv")
-    assert os.path.isfile(config_file_path)
+    tracmap_data = _import_multifile_tracmap(config_file)
     assert isinstance(tracmap_data, pd.DataFrame)
     assert_frame_equal(tracmap_data, _geo2utm("tests/data/expected_concatenated_data.csv"))
+    assert not os.path.isfile("outputs/input_concatenated_data.csv")
+
+
+def test_import_multifile_tracmap_dump(tmp_path):
+    config_file = pd.read_json("tests/data/expected_nerd_config.json", typ="series")
+    config_file["output_path"] = str(tmp_path)
+    tracmap_data = _import_multifile_tracmap(config_file, "input_concatenated_data.csv")
+    dumped_data = tmp_path / "input_concatenated_data.csv"
+    assert dumped_data.is_file()
+    assert_frame_equal(tracmap_data, _geo2utm(dumped_data))
 
 
 def test__create_df_list():
@@ -101,3 +113,39 @@ def test__select_parameters_by_index():
     assert expected_aperture_diameter == obtained_aperture_diameter
     assert expected_density_function == obtained_density_function
     assert expected_swap_width == obtained_swap_width
+
+
+def test_read_tracmap_dtypes():
+    tracmap_data = _read_tracmap("tests/data/tracmap_sample_data.txt")
+    for name, dtype in tracmap_dtypes.items():
+        if dtype == "category":
+            assert isinstance(tracmap_data[name].dtype, pd.CategoricalDtype)
+        else:
+            assert tracmap_data[name].dtype == dtype
+    expected_data = pd.read_csv("tests/data/expected_input_data.csv")
+    np.testing.assert_array_equal(tracmap_data.Logging_on, expected_data.Logging_on)
+    np.testing.assert_array_equal(tracmap_data.Lat, expected_data.Lat)
+    np.testing.assert_array_equal(tracmap_data.date.astype(int), expected_data.date.astype(int))
+    np.testing.assert_array_equal(tracmap_data.time.astype(str), expected_data.time)
+
+
+def test_read_tracmap_timestamps():
+    tracmap_data = _read_tracmap("tests/data/tracmap_sample_data.txt")
+    expected_data = pd.read_csv("tests/data/expected_input_data.csv")
+    expected_timestamps = pd.to_datetime(
+        expected_data.date.astype(str).str.zfill(8) + expected_data.time,
+        format="%d%m%Y%H:%M:%S",
+    )
+    assert tracmap_data.timestamp.dtype == "datetime64[s]"
+    np.testing.assert_array_equal(tracmap_data.timestamp, expected_timestamps)
+    assert tracmap_data.timestamp.iloc[0] == pd.Timestamp("2015-03-28 14:02:16")
+
+
+def test_tracmap_timestamps():
+    obtained = _tracmap_timestamps(
+        np.array([28032015, 4122013, 31122099]), np.array(["14:02:16", "09:44:10", "23:59:59"])
+    )
+    expected = pd.to_datetime(
+        ["28032015 14:02:16", "04122013 09:44:10", "31122099 23:59:59"], format="%d%m%Y %H:%M:%S"
+    ).to_numpy()
+    np.testing.assert_array_equal(obtained, expected)
@@ -0,0 +1,37 @@
+import subprocess
+import sys
+
+heavy_modules = ["scipy", "matplotlib", "fiona", "shapely", "geojsoncontour", "tqdm"]
+
+
+def loaded_modules(code):
+    output = subprocess.run(
+        [sys.executable, "-c", code + "; import sys; print(' '.join(sys.modules))"],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return {name.split(".")[0] for name in output.split()}
+
+
+def test_import_does_not_load_heavy_dependencies():
+    modules = loaded_modules("import nerd, nerd.calibration, nerd.io, nerd.mapping")
+    assert modules.isdisjoint(heavy_modules)
+
+
+def test_nerd_does_not_load_heavy_dependencies():
+    modules = loaded_modules("import nerd.io; assert isinstance(nerd.io.Nerd, type)")
+    assert modules.isdisjoint(heavy_modules)
+    modules = loaded_modules(
+        "from nerd.io import Nerd; Nerd('tests/data/expected_nerd_config.json')"
+    )
+    assert modules.isdisjoint(heavy_modules)
+
+
+def test_import_orders():
+    for code in [
+        "import nerd.io.Nerd; from nerd.io import Nerd; assert isinstance(Nerd, type)",
+        "import nerd.mapping; from nerd.io import Nerd; assert isinstance(Nerd, type)",
+        "from nerd.io.Nerd import Nerd; import nerd.io; assert nerd.io.Nerd is Nerd",
+    ]:
+        loaded_modules(code)
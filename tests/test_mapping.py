@@ -12,10 +12,12 @@ from nerd.mapping import (
     _sign_of_direction,
     _slope_between_two_points,
     _is_inside_tile,
+    _grid_window,
     _generate_contours,
     _create_contour_polygon_list,
     _export_contour_list_as_shapefile,
     _calculate_total_density,
+    _calculate_unit_flow_densities,
     _generate_grid_density,
     _density_contours_intervals,
     _generate_uniform_density_array,
@@ -380,6 +382,60 @@ class TestMapping(TestCase):
         assert n_obtained == n_expected
 
 
+def test_calculate_unit_flow_densities():
+    # Outside of TestMapping so that its setUp does not advance random_state
+    spatial_resolution = 2
+    trackmap_data = pd.DataFrame(
+        {
+            "easting": np.linspace(0, 10, 10),
+            "northing": np.linspace(0, 10, 10),
+            "Logging_on": np.array([1, 1, 1, 1, 0, 0, 0, 1, 1, 1]),
+            "Speed": [20, 21, 20, 18, 17, 15, 15, 15, 15, 15],
+        }
+    )
+    config_json = pd.read_json("tests/data/expected_nerd_config.json")
+    flow_rate_function = np.poly1d([0.0007, -0.06, 1.7])
+    _, _, total_density_expected = _calculate_total_density(
+        trackmap_data, config_json, spatial_resolution, flow_rate_function
+    )
+    _, _, apertures, unit_flow_densities = _calculate_unit_flow_densities(
+        trackmap_data, config_json, spatial_resolution
+    )
+    np.testing.assert_array_equal(apertures, [90, 95, 100])
+    total_density_obtained = np.tensordot(
+        flow_rate_function(apertures), unit_flow_densities, axes=1
+    )
+    np.testing.assert_array_almost_equal(total_density_obtained, total_density_expected)
+
+
+def test_first_point_is_its_own_previous_point():
+    x = np.array([0.0, 1, 2, 50])
+    y = np.array([0.0, 2, 4, -30])
+    assert _cell_edges_slopes(x, y, 0) == (-0.5, -0.5)
+    # The last point does not change the tile of the first one
+    y[-1] = 70
+    assert _cell_edges_slopes(x, y, 0) == (-0.5, -0.5)
+
+
+def test_grid_window():
+    x_axis = np.arange(0.0, 100, 2)
+    y_axis = np.arange(10.0, 60, 2)
+    x_rect = [11.5, 20, 24, 15, 11.5]
+    y_rect = [12, 10.5, 30, 31, 12]
+    rows, columns = _grid_window(x_rect, y_rect, x_axis, y_axis)
+    assert (columns.start, columns.stop, rows.start, rows.stop) == (6, 13, 1, 11)
+    x_grid, y_grid = np.meshgrid(x_axis, y_axis)
+    points = np.column_stack([x_grid.ravel(), y_grid.ravel()])
+    inside_mask = _is_inside_tile(x_rect, y_rect, points).reshape(x_grid.shape)
+    window_mask = np.zeros_like(inside_mask)
+    window_mask[rows, columns] = True
+    assert inside_mask.any() and not (inside_mask & ~window_mask).any()
+    rows, columns = _grid_window([200, 210, 210, 200, 200], y_rect, x_axis, y_axis)
+    assert columns.stop == columns.start
+    rows, columns = _grid_window([np.nan] * 5, y_rect, x_axis, y_axis)
+    assert rows.stop == rows.start
+
+
 def assess_hash(test_csv_filename, expected_hash):
     md5_hash = hashlib.md5()
     a_file = open(test_csv_filename, "rb")
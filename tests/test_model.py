@@ -0,0 +1,70 @@
+import numpy as np
+from unittest import TestCase
+from nerd import solver, SolverCache
+from nerd.calibration import model
+from nerd.density_functions import normal, uniform
+
+
+def squared_uniform(distance, width, parameter):
+    return uniform(distance, width, parameter**2)
+
+
+class TestModel(TestCase):
+    def setUp(self) -> None:
+        self.aperture_diameters = np.linspace(50, 100, 4)
+        self.helicopter_speeds = np.linspace(10, 40, 3)
+        self.swath_width = 60
+        self.flow_rate_function = np.poly1d([0.0007, -0.06, 1.7])
+
+    def expected_matrix(self, density_function):
+        return np.array(
+            [
+                [
+                    solver(
+                        diameter,
+                        speed,
+                        self.swath_width,
+                        density_function,
+                        self.flow_rate_function,
+                    )(0)
+                    for diameter in self.aperture_diameters
+                ]
+                for speed in self.helicopter_speeds
+            ]
+        )
+
+    def test_matches_cell_by_cell_solver(self):
+        obtained = model(
+            self.aperture_diameters,
+            self.helicopter_speeds,
+            self.swath_width,
+            normal,
+            self.flow_rate_function,
+        )
+        assert obtained.shape == (3, 4)
+        np.testing.assert_allclose(obtained, self.expected_matrix(normal))
+
+    def test_with_cache(self):
+        cache = SolverCache()
+        obtained = model(
+            self.aperture_diameters,
+            self.helicopter_speeds,
+            self.swath_width,
+            normal,
+            self.flow_rate_function,
+            cache,
+        )
+        np.testing.assert_allclose(obtained, self.expected_matrix(normal))
+        assert cache.misses == 12
+
+    def test_process_pool_for_non_linear_function(self):
+        obtained = model(
+            self.aperture_diameters,
+            self.helicopter_speeds,
+            self.swath_width,
+            squared_uniform,
+            self.flow_rate_function,
+            n_workers=2,
+        )
+        expected = self.expected_matrix(uniform)
+        np.testing.assert_allclose(obtained, expected, rtol=1e-6)
@@ -1,18 +1,15 @@
-from nerd.io import Nerd
+from nerd.io import Nerd, _read_config
 from unittest import TestCase
 import hashlib
+import json
 import os
 import numpy as np
-import pandas as pd
 
 
 class TestNerd(TestCase):
     def setUp(self) -> None:
-        self.expected_config_json_type_option = "series"
         self.expected_config_file: str = "tests/data/expected_nerd_config.json"
-        self.config_json = pd.read_json(
-            self.expected_config_file, typ=self.expected_config_json_type_option
-        )  # type: ignore
+        self.config_json = _read_config(self.expected_config_file)
         self.input_calibration_data = "tests/data/expected_calibration_data.csv"
         self.expected_results_filename = "outputs/nerd_geojson.json"
         self.imported_concatenated_csv = "outputs/input_concatenated_data.csv"
@@ -22,16 +19,44 @@ class TestNerd(TestCase):
         self.teardown()
         nerd_model = Nerd(self.expected_config_file)
         nerd_model.calculate_total_density()
-        obtained_json_type = nerd_model.config_json_type_option
-        assert obtained_json_type == self.expected_config_json_type_option
         nerd_model.export_results_geojson(target_density=0.02)
         self.assert_exist_the_file(self.expected_results_filename)
         np.testing.assert_array_almost_equal(
             nerd_model.calculated_levels, expected_levels, decimal=2
         )
+        assert not os.path.exists(self.imported_concatenated_csv)
+        self.teardown()
+
+    def test_dump_input_data(self):
+        config_file = "tests/data/nerd_config_dump.json"
+        self.config_json["dump_input_data"] = True
+        with open(config_file, "w") as config_json_file:
+            json.dump(self.config_json, config_json_file)
+        try:
+            Nerd(config_file)
+        finally:
+            os.remove(config_file)
         self.assert_exist_the_file(self.imported_concatenated_csv)
         self.teardown()
 
+    def test_density_percentiles(self):
+        nerd_model = Nerd(self.expected_config_file)
+        nerd_model.calculate_total_density()
+        percentiles = nerd_model.calculate_density_percentiles(n_draws=200, seed=1)
+        assert percentiles.shape == (3,) + nerd_model._total_density.shape
+        assert (percentiles[0] <= percentiles[2]).all()
+        np.testing.assert_allclose(percentiles[1], nerd_model._total_density, rtol=0.1)
+        width_percentiles = nerd_model.calculate_density_percentiles(
+            n_draws=200, seed=1, swath_width_sd=5, n_width_groups=3
+        )
+        assert width_percentiles.shape == percentiles.shape
+        assert (width_percentiles[0] <= width_percentiles[2]).all()
+        # Swath width draws move bait out of and into every cell
+        band = percentiles[2] - percentiles[0]
+        width_band = width_percentiles[2] - width_percentiles[0]
+        assert width_band.sum() > 1.5 * band.sum()
+        self.teardown()
+
     def teardown(self):
         self._remove_path(self.expected_results_filename)
         self._remove_path(self.imported_concatenated_csv)
@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+import utm
+
+from nerd.io import projection
+
+
+@pytest.fixture()
+def coordinates():
+    rng = np.random.default_rng(1)
+    return rng.uniform(-79, 83, 500), rng.uniform(-180, 180, 500)
+
+
+def test_from_latlon_matches_utm(coordinates):
+    latitude, longitude = coordinates
+    easting, northing, zone_number, zone_letter = projection.from_latlon(latitude, longitude)
+    for i in range(len(latitude)):
+        expected = utm.from_latlon(latitude[i], longitude[i])
+        np.testing.assert_allclose([easting[i], northing[i]], expected[:2], atol=2e-3)
+        assert (zone_number[i], zone_letter[i]) == expected[2:]
+
+
+def test_forced_zone_matches_utm():
+    # Guadalupe Island and a point across the boundary between zones 11 and 12
+    latitude = np.array([29.05, 29.0, 28.9])
+    longitude = np.array([-118.3, -114.1, -113.9])
+    easting, northing, zone_number, _ = projection.from_latlon(latitude, longitude, 11)
+    np.testing.assert_array_equal(zone_number, 11)
+    expected = utm.from_latlon(latitude, longitude, force_zone_number=11)
+    np.testing.assert_allclose(easting, expected[0], atol=2e-3)
+    np.testing.assert_allclose(northing, expected[1], atol=2e-3)
+    _, _, own_zones, _ = projection.from_latlon(latitude, longitude)
+    np.testing.assert_array_equal(own_zones, [11, 11, 12])
+
+
+def test_round_trip(coordinates):
+    latitude, longitude = coordinates
+    easting, northing, zone_number, _ = projection.from_latlon(latitude, longitude)
+    obtained_latitude, obtained_longitude = projection.to_latlon(
+        easting, northing, zone_number, latitude >= 0
+    )
+    np.testing.assert_allclose(obtained_latitude, latitude, atol=1e-10)
+    np.testing.assert_allclose(obtained_longitude, longitude, atol=1e-10)
+
+
+def test_zone_exceptions():
+    np.testing.assert_array_equal(
+        projection.zone_numbers([60, 60, 78, 78, 78], [4, 2, 8, 20, 35]), [32, 31, 31, 33, 37]
+    )
+    np.testing.assert_array_equal(projection.zone_letters([-80, -1, 0, 72, 84]), list("CMNXX"))
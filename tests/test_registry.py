@@ -0,0 +1,143 @@
+import gc
+import weakref
+
+import numpy as np
+from importlib.metadata import EntryPoint
+from scipy.integrate import quad
+from unittest import TestCase, mock
+from nerd.calibration.best_density_function import _get_density_functions_array
+from nerd.density_functions import (
+    DensityFunction,
+    as_density_function,
+    get_density_function,
+    normal,
+    register_density_function,
+    registered_density_functions,
+    triangular,
+    uniform,
+)
+from nerd.density_functions import registry
+
+
+def cosine(distance, width, parameter):
+    return parameter * np.cos(np.pi * distance / width) * (np.abs(distance) < width / 2)
+
+
+class TestRegistry(TestCase):
+    def setUp(self) -> None:
+        self.width = 60
+
+    def tearDown(self) -> None:
+        registry._registry.pop("cosine", None)
+        registry._registry_by_function.pop(cosine, None)
+
+    def test_built_in_functions_are_registered_by_name(self):
+        names = [density_function.name for density_function in registered_density_functions()]
+        assert names == ["normal", "triangular", "uniform"]
+        assert get_density_function("triangular").function == triangular
+        assert _get_density_functions_array() == [normal, triangular, uniform]
+
+    def test_unit_integrals(self):
+        for density_function in registered_density_functions():
+            expected = quad(
+                lambda x: density_function(x, self.width, 1), -self.width / 2, self.width / 2
+            )[0]
+            self.assertAlmostEqual(density_function.unit_integral(self.width), expected, places=6)
+
+    def test_evaluate(self):
+        distance = np.array([-40.0, 0.0, 10.0])
+        obtained = get_density_function("uniform").evaluate(distance, self.width, 2)
+        np.testing.assert_array_equal(obtained, [0, 2, 2])
+
+    def test_support(self):
+        assert get_density_function("uniform").support(self.width) == 30
+        assert get_density_function("triangular").support(self.width) == 30
+        assert get_density_function("normal").support(self.width) == np.inf
+
+    def test_evaluate_into_buffer(self):
+        distance = np.array([-40.0, 0.0, 10.0])
+        buffer = np.empty_like(distance)
+        obtained = get_density_function("uniform").evaluate(distance, self.width, 2, out=buffer)
+        assert obtained is buffer
+        np.testing.assert_array_equal(buffer, [0, 2, 2])
+        # Linear profiles scale the cached unit profile, without calling the function again
+        counted_uniform = mock.Mock(side_effect=uniform)
+        density_function = DensityFunction(counted_uniform, name="uniform", linear=True)
+        for parameter in [2, 3]:
+            density_function.evaluate(distance, self.width, parameter, out=buffer)
+        np.testing.assert_array_equal(buffer, [0, 3, 3])
+        assert counted_uniform.call_count == 1
+        squared = DensityFunction(lambda distance, width, parameter: parameter**2 + 0 * distance)
+        squared.evaluate(distance, self.width, 3, out=buffer)
+        np.testing.assert_array_equal(buffer, [9, 9, 9])
+
+    def test_unregistered_functions_are_bounded(self):
+        registry._unregistered.clear()
+        functions = [lambda distance, width, parameter: parameter * distance for _ in range(100)]
+        density_functions = [as_density_function(function) for function in functions]
+        assert len(registry._unregistered) == registry._MAX_UNREGISTERED
+        assert as_density_function(functions[-1]) is density_functions[-1]
+        assert as_density_function(functions[0]) is not density_functions[0]
+        reference = weakref.ref(functions[1])
+        del functions, density_functions
+        gc.collect()
+        assert reference() is None
+
+    def test_unknown_name(self):
+        with self.assertRaises(ValueError):
+            get_density_function("cosine")
+
+    def test_unregistered_function_has_no_integral(self):
+        density_function = as_density_function(cosine)
+        assert isinstance(density_function, DensityFunction)
+        assert density_function.unit_integral is None
+        assert as_density_function(uniform) is get_density_function("uniform")
+
+    def test_linearity(self):
+        assert as_density_function(cosine).is_linear(self.width)
+        assert not as_density_function(lambda x, w, p: normal(x, w, p) ** 2).is_linear(self.width)
+
+    def test_scalar_function_is_not_linear(self):
+        def scalar_uniform(distance, width, parameter):
+            return parameter if abs(distance) <= width / 2 else 0.0
+
+        assert not as_density_function(scalar_uniform).is_linear(self.width)
+
+    def test_unit_integral_of_linear_user_function(self):
+        obtained = as_density_function(cosine).integrate_unit_profile(np.array([60, 60, 30]))
+        np.testing.assert_allclose(obtained, 2 * np.array([60, 60, 30]) / np.pi)
+
+    def test_unit_profile_template(self):
+        distance = np.linspace(-30, 30, 7)
+        density_function = get_density_function("triangular")
+        template = density_function.unit_profile(distance, self.width)
+        assert density_function.unit_profile(distance.copy(), self.width) is template
+        assert not template.flags.writeable
+        np.testing.assert_allclose(3 * template, triangular(distance, self.width, 3))
+
+    def test_unit_profile_cache_is_bounded(self):
+        density_function = as_density_function(cosine)
+        distance = np.linspace(-30, 30, 7)
+        first = density_function.unit_profile(distance, 1.0)
+        for width in range(2, registry._MAX_UNIT_PROFILES + 2):
+            density_function.unit_profile(distance, float(width))
+        assert len(density_function._unit_profiles) == registry._MAX_UNIT_PROFILES
+        assert density_function.unit_profile(distance, 1.0) is not first
+
+    def test_register_density_function(self):
+        register_density_function(cosine, lambda width: 2 * width / np.pi)
+        assert get_density_function("cosine").function == cosine
+        assert cosine in _get_density_functions_array()
+
+    def test_register_from_entry_point(self):
+        plugin = EntryPoint("cosine", "test_registry:cosine", registry.ENTRY_POINT_GROUP)
+        with mock.patch("importlib.metadata.entry_points", return_value=[plugin]):
+            registry._load_entry_points()
+        assert get_density_function("cosine").function == cosine
+
+    def test_entry_point_cannot_replace_builtin(self):
+        plugin = EntryPoint("uniform", "test_registry:cosine", registry.ENTRY_POINT_GROUP)
+        with mock.patch("importlib.metadata.entry_points", return_value=[plugin]):
+            with self.assertWarnsRegex(UserWarning, "built-in"):
+                registry._load_entry_points()
+        assert get_density_function("uniform").function == uniform
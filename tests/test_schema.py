@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from nerd.io.import_data import _read_tracmap, tracmap_dtypes, tracmap_fields
+from nerd.io.schema import _check_constraints, _schema_dtypes
+
+tracmap_filename = "tests/data/tracmap_sample_data.txt"
+
+
+def test_schema_dtypes():
+    assert tracmap_dtypes["Logging_on"] == np.uint8
+    assert tracmap_dtypes["heading"] == np.float32
+    assert tracmap_dtypes["Lat"] == np.float64
+    assert tracmap_dtypes["date"] == "category"
+    assert tracmap_dtypes["time"] == "category"
+    assert _schema_dtypes([{"name": "label", "type": "string"}]) == {"label": str}
+    tracmap_data = _read_tracmap(tracmap_filename)
+    assert tracmap_data.Logging_on.dtype == np.uint8
+    assert list(tracmap_data.date.cat.categories) == ["28032015"]
+
+
+@pytest.mark.parametrize(
+    "line, message",
+    [
+        ("$TMDAT,28032015,14:02:20,95.0,-87.3,0.1,37.6,0,9", "Lat is above 90"),
+        ("$TMDAT,28032015,14:02:20,18.5,-87.3,-1.0,37.6,0,9", "Speed is below 0"),
+        ("$TMDAT,28032015,14:02:20,18.5,-87.3,0.1,37.6,2,9", "Logging_on is not 0 or 1"),
+        ("$TMDAT,28132015,14:02:20,18.5,-87.3,0.1,37.6,0,9", "date does not match"),
+        ("$TMDAT,28032015,14:62:20,18.5,-87.3,0.1,37.6,0,9", "time does not match"),
+        ("$TMDAT,28032015,,18.5,-87.3,0.1,37.6,0,9", "time is missing"),
+    ],
+)
+def test_bad_rows_raise(tmp_path, line, message):
+    with open(tracmap_filename) as tracmap_file:
+        lines = tracmap_file.read().splitlines()
+    bad_filename = tmp_path / "bad.txt"
+    bad_filename.write_text("\n".join(lines[:3] + [line] + lines[3:]) + "\n")
+    with pytest.raises(ValueError, match="{}.*first at row 3".format(message)):
+        _read_tracmap(str(bad_filename))
+
+
+def test_missing_values_are_allowed():
+    data = pd.DataFrame({"altitude": np.array([9, np.nan], dtype=np.float32)})
+    _check_constraints(data, [field for field in tracmap_fields if field["name"] == "altitude"], "")
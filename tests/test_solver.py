@@ -0,0 +1,204 @@
+import numpy as np
+from unittest import TestCase, mock
+from nerd.density_functions import DensityFunction, uniform, triangular, normal
+from nerd.solver import (
+    SolverCache,
+    evaluate_profiles,
+    solve_batch,
+    _fit_parameter,
+    _fit_parameter_numerically,
+)
+
+
+class TestSolver(TestCase):
+    def setUp(self) -> None:
+        self.aperture_diameter = 75
+        self.helicopter_speed = 25
+        self.swath_width = 60
+        self.flow_rate_function = np.poly1d([0.0007, -0.06, 1.7])
+        self.mass_per_meter = self.flow_rate_function(self.aperture_diameter) / 25
+
+    def test_closed_form_matches_numeric_root(self):
+        for density_function in [uniform, triangular, normal]:
+            obtained = _fit_parameter(
+                self.aperture_diameter,
+                self.helicopter_speed,
+                self.swath_width,
+                density_function,
+                self.flow_rate_function,
+            )
+            expected = _fit_parameter_numerically(
+                self.mass_per_meter, self.swath_width, density_function
+            )
+            self.assertAlmostEqual(obtained, expected, places=6)
+
+    def test_linear_user_supplied_function(self):
+        def custom_function(distance, width, parameter):
+            return triangular(distance, width, parameter)
+
+        obtained = _fit_parameter(
+            self.aperture_diameter,
+            self.helicopter_speed,
+            self.swath_width,
+            custom_function,
+            self.flow_rate_function,
+        )
+        expected = 2 * self.mass_per_meter / self.swath_width
+        self.assertAlmostEqual(obtained, expected, places=8)
+
+    def test_non_linear_user_supplied_function_falls_back_to_root_finding(self):
+        def custom_function(distance, width, parameter):
+            return uniform(distance, width, parameter**2)
+
+        obtained = _fit_parameter(
+            self.aperture_diameter,
+            self.helicopter_speed,
+            self.swath_width,
+            custom_function,
+            self.flow_rate_function,
+        )
+        expected = np.sqrt(self.mass_per_meter / self.swath_width)
+        self.assertAlmostEqual(obtained, expected, places=8)
+
+    def test_declared_parameter_derivative_is_passed_to_root_finder(self):
+        def custom_function(distance, width, parameter):
+            return uniform(distance, width, parameter**2)
+
+        derivative = mock.Mock(side_effect=lambda distance, width, parameter: 2 * parameter)
+        density_function = DensityFunction(custom_function, parameter_derivative=derivative)
+        obtained = _fit_parameter_numerically(
+            self.mass_per_meter, self.swath_width, density_function
+        )
+        expected = np.sqrt(self.mass_per_meter / self.swath_width)
+        self.assertAlmostEqual(obtained, expected, places=8)
+        assert derivative.call_count > 0
+        with mock.patch("scipy.optimize.fsolve", return_value=[expected]) as fsolve:
+            _fit_parameter_numerically(self.mass_per_meter, self.swath_width, density_function)
+            jacobian = fsolve.call_args.kwargs["fprime"]([2.0])
+        self.assertAlmostEqual(jacobian[0][0], 4 * self.swath_width, places=6)
+
+    def test_numeric_root_is_reproducible(self):
+        def custom_function(distance, width, parameter):
+            return normal(distance, width, parameter)
+
+        state = np.random.get_state()
+        first = _fit_parameter_numerically(self.mass_per_meter, self.swath_width, custom_function)
+        second = _fit_parameter_numerically(self.mass_per_meter, self.swath_width, custom_function)
+        assert first == second
+        assert np.random.get_state()[1].tolist() == state[1].tolist()
+
+    def test_warm_start(self):
+        def custom_function(distance, width, parameter):
+            return triangular(distance, width, parameter)
+
+        expected = 2 * self.mass_per_meter / self.swath_width
+        obtained = _fit_parameter_numerically(
+            self.mass_per_meter, self.swath_width, custom_function, starting_parameter=expected
+        )
+        self.assertAlmostEqual(obtained, expected, places=10)
+
+
+class TestSolveBatch(TestCase):
+    def setUp(self) -> None:
+        self.aperture_diameters = np.array([60, 75, 90])
+        self.helicopter_speeds = np.array([[20], [25]])
+        self.swath_width = 60
+        self.flow_rate_function = np.poly1d([0.0007, -0.06, 1.7])
+
+    def test_matches_scalar_fit(self):
+        for density_function in [uniform, triangular, normal]:
+            obtained = solve_batch(
+                self.aperture_diameters,
+                self.helicopter_speeds,
+                self.swath_width,
+                density_function,
+                self.flow_rate_function,
+            )
+            assert obtained.shape == (2, 3)
+            expected = _fit_parameter(
+                90, 25, self.swath_width, density_function, self.flow_rate_function
+            )
+            self.assertAlmostEqual(obtained[1, 2], expected)
+
+    def test_user_supplied_function(self):
+        def custom_function(distance, width, parameter):
+            return uniform(distance, width, parameter)
+
+        obtained = solve_batch(
+            self.aperture_diameters,
+            self.helicopter_speeds,
+            self.swath_width,
+            custom_function,
+            self.flow_rate_function,
+        )
+        expected = solve_batch(
+            self.aperture_diameters,
+            self.helicopter_speeds,
+            self.swath_width,
+            uniform,
+            self.flow_rate_function,
+        )
+        np.testing.assert_allclose(obtained, expected, rtol=1e-6)
+
+    def test_evaluate_profiles(self):
+        distance = np.array([-40, 0, 10])
+        parameters = np.array([1.0, 2.0])
+        obtained = evaluate_profiles(distance, self.swath_width, parameters, triangular)
+        expected = np.array([[0, 1, 2 / 3], [0, 2, 4 / 3]])
+        np.testing.assert_allclose(obtained, expected)
+
+
+class TestSolverCache(TestCase):
+    def setUp(self) -> None:
+        self.flow_rate_function = np.poly1d([0.0007, -0.06, 1.7])
+
+    def test_counts_hits_and_misses(self):
+        cache = SolverCache()
+        first = cache.fit_parameter(75, 25, 60, normal, self.flow_rate_function)
+        second = cache.fit_parameter(75, 25, 60, normal, self.flow_rate_function)
+        cache.fit_parameter(75, 30, 60, normal, self.flow_rate_function)
+        assert first == second
+        assert cache.hits == 1
+        assert cache.misses == 2
+        assert len(cache) == 2
+
+    def test_evicts_least_recently_used(self):
+        cache = SolverCache(max_size=2)
+        cache.fit_parameter(75, 20, 60, uniform, self.flow_rate_function)
+        cache.fit_parameter(75, 25, 60, uniform, self.flow_rate_function)
+        cache.fit_parameter(75, 20, 60, uniform, self.flow_rate_function)
+        cache.fit_parameter(75, 30, 60, uniform, self.flow_rate_function)
+        cache.fit_parameter(75, 20, 60, uniform, self.flow_rate_function)
+        assert len(cache) == 2
+        assert cache.hits == 2
+        cache.fit_parameter(75, 25, 60, uniform, self.flow_rate_function)
+        assert cache.misses == 4
+
+    def test_quantizes_speed(self):
+        cache = SolverCache(speed_resolution=0.5)
+        obtained = cache.fit_parameter(75, 24.9, 60, uniform, self.flow_rate_function)
+        expected = _fit_parameter(75, 25, 60, uniform, self.flow_rate_function)
+        cache.fit_parameter(75, 25.1, 60, uniform, self.flow_rate_function)
+        self.assertAlmostEqual(obtained, expected)
+        assert cache.hits == 1
+
+    def test_clear(self):
+        cache = SolverCache()
+        cache.fit_parameter(75, 25, 60, uniform, self.flow_rate_function)
+        cache.clear()
+        assert len(cache) == 0
+        assert cache.misses == 0
+
+    def test_starting_parameter_on_miss(self):
+        def squared_uniform(distance, width, parameter):
+            return uniform(distance, width, parameter**2)
+
+        cache = SolverCache()
+        negative_root = cache.fit_parameter(
+            75, 25, 60, squared_uniform, self.flow_rate_function, starting_parameter=-1
+        )
+        assert negative_root < 0
+        cached_root = cache.fit_parameter(
+            75, 25, 60, squared_uniform, self.flow_rate_function, starting_parameter=1
+        )
+        assert cached_root == negative_root
@@ -0,0 +1,103 @@
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+from pandas._testing import assert_frame_equal
+
+import nerd.io.track_cache
+from nerd.io import TrackCache, _TrackStore, _read_config
+from nerd.io.geo2utm import _add_utm_columns
+from nerd.io.import_data import _read_tracmap
+from nerd.io.track_cache import PARSER_VERSION
+
+tracmap_filename = "tests/data/tracmap_sample_data.txt"
+
+
+def test_load_matches_parser(tmp_path):
+    cache = TrackCache(str(tmp_path / "cache"))
+    columns = cache.load(tracmap_filename)
+    assert isinstance(columns["easting"], np.memmap)
+    assert_frame_equal(pd.DataFrame(columns), _add_utm_columns(_read_tracmap(tracmap_filename)))
+    entries = cache.entries()
+    assert list(entries.key) == [cache.key(tracmap_filename)]
+    assert entries.n_rows[0] == len(columns["easting"])
+    assert entries.size_bytes[0] > 0
+
+
+def test_hit_does_not_parse(tmp_path, monkeypatch):
+    cache = TrackCache(str(tmp_path))
+    expected = cache.load(tracmap_filename)
+
+    def fail(*args):
+        raise AssertionError("The cached file was parsed again")
+
+    monkeypatch.setattr(nerd.io.track_cache, "_read_tracmap", fail)
+    obtained = cache.load(tracmap_filename)
+    for name in expected:
+        np.testing.assert_array_equal(obtained[name], expected[name])
+
+
+def test_key_changes_with_content_and_parser_version(tmp_path, monkeypatch):
+    cache = TrackCache(str(tmp_path / "cache"))
+    copied_filename = str(tmp_path / "tracmap.txt")
+    shutil.copyfile(tracmap_filename, copied_filename)
+    key = cache.key(copied_filename)
+    assert key == cache.key(tracmap_filename)
+    with open(copied_filename, "a") as copy:
+        copy.write("\n")
+    assert cache.key(copied_filename) != key
+    monkeypatch.setattr(
+        nerd.io.track_cache, "PARSER_VERSION", nerd.io.track_cache.PARSER_VERSION + 1
+    )
+    assert cache.key(tracmap_filename) != key
+
+
+def test_clear(tmp_path, monkeypatch):
+    cache = TrackCache(str(tmp_path))
+    cache.load(tracmap_filename)
+    old_version = nerd.io.track_cache.PARSER_VERSION
+    monkeypatch.setattr(nerd.io.track_cache, "PARSER_VERSION", old_version + 1)
+    cache.load(tracmap_filename)
+    assert len(cache.entries()) == 2
+    assert cache.clear(parser_version=old_version) == 1
+    assert list(cache.entries().parser_version) == [old_version + 1]
+    assert cache.clear() == 1
+    assert cache.entries().empty
+    assert os.listdir(tmp_path) == []
+
+
+def test_track_store_from_cache(tmp_path):
+    config_file = _read_config("tests/data/expected_nerd_config.json")
+    cache = TrackCache(str(tmp_path))
+    tracks = _TrackStore.from_config(config_file)
+    for _ in range(2):
+        cached_tracks = _TrackStore.from_config(config_file, cache=cache)
+        assert_frame_equal(cached_tracks.to_dataframe(), tracks.to_dataframe())
+        np.testing.assert_array_equal(cached_tracks.file_index, tracks.file_index)
+    assert len(cache.entries()) == len(config_file["resources"])
+
+
+def test_clear_removes_interrupted_writes(tmp_path):
+    cache = TrackCache(str(tmp_path))
+    cache.load(tracmap_filename)
+    # A write interrupted before its metadata, and one interrupted before its rename
+    os.makedirs(str(tmp_path / "{}-v{}".format("0" * 64, PARSER_VERSION)))
+    shutil.copytree(
+        str(tmp_path / cache.key(tracmap_filename)), str(tmp_path / ".partial-complete")
+    )
+    assert len(cache.entries()) == 1
+    assert cache.clear() == 3
+    assert os.listdir(tmp_path) == []
+
+
+def test_clear_keeps_foreign_content(tmp_path):
+    cache = TrackCache(str(tmp_path))
+    cache.load(tracmap_filename)
+    os.makedirs(str(tmp_path / "important_data"))
+    (tmp_path / "important_data" / "notes.txt").write_text("keep")
+    (tmp_path / "readme.txt").write_text("keep")
+    assert cache.clear(parser_version=PARSER_VERSION - 1) == 0
+    assert cache.clear() == 1
+    assert sorted(os.listdir(tmp_path)) == ["important_data", "readme.txt"]
+    assert os.listdir(tmp_path / "important_data") == ["notes.txt"]
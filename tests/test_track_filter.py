@@ -0,0 +1,107 @@
+import numpy as np
+import pytest
+
+from nerd.calibration import fit_flow_rate
+from nerd.density_functions import uniform
+from nerd.io import (
+    _TrackStore,
+    _decimate_tracks,
+    _douglas_peucker,
+    _drop_logging_off,
+    _read_config,
+)
+from nerd.mapping.tiling import _add_tile_densities, _generate_grid_density
+
+config_file_path = "tests/data/expected_nerd_config.json"
+
+
+@pytest.fixture()
+def tracks():
+    config_file = _read_config(config_file_path)
+    return _TrackStore.from_config(config_file)
+
+
+def density_on_grid(tracks, x_grid, y_grid):
+    flow_rate_function = fit_flow_rate([60, 80, 100], [0.5, 1.1, 2.0])
+    swath_width = tracks.file_parameters[0][1]
+    total_density = np.zeros_like(x_grid)
+    _add_tile_densities(
+        tracks,
+        range(len(tracks) - 2),
+        total_density,
+        x_grid[0],
+        y_grid[:, 0],
+        flow_rate_function,
+        np.linspace(-swath_width / 2, swath_width / 2, swath_width // 5),
+    )
+    return total_density
+
+
+def test_drop_logging_off_keeps_density(tracks):
+    tracks.columns["Logging_on"][60:120] = 0
+    dropped = _drop_logging_off(tracks)
+    assert len(dropped) <= len(tracks) - 57
+    np.testing.assert_array_equal(dropped["Logging_on"][:3], tracks["Logging_on"][:3])
+    x_grid, y_grid = _generate_grid_density(tracks["easting"], tracks["northing"], 5)
+    expected_density = density_on_grid(tracks, x_grid, y_grid)
+    np.testing.assert_array_equal(density_on_grid(dropped, x_grid, y_grid), expected_density)
+    assert expected_density.max() > 0
+
+
+def test_douglas_peucker():
+    x = np.arange(10.0)
+    y = np.array([0, 0.1, -0.1, 0, 0.2, 5, 0, 0.1, 0, 0])
+    keep = _douglas_peucker(x, y, 0.5)
+    np.testing.assert_array_equal(np.flatnonzero(keep), [0, 4, 5, 6, 9])
+    fixed = np.zeros(10, dtype=bool)
+    fixed[2] = True
+    assert keep[2] == 0 and _douglas_peucker(x, y, 0.5, fixed)[2]
+    assert _douglas_peucker(x, y, 10).sum() == 2
+
+
+def test_decimate_tracks(tracks):
+    tracks.columns["Logging_on"][60:120] = 0
+    decimated = _decimate_tracks(tracks, 1)
+    assert len(decimated) < len(tracks)
+    assert (decimated["Logging_on"] == 0).sum() == 60
+    np.testing.assert_array_equal(decimated.file_lengths > 0, tracks.file_lengths > 0)
+    assert len(_decimate_tracks(tracks, 0)) == len(tracks)
+
+
+def test_decimate_tracks_conserves_mass():
+    # A flight at about 35 m/s; the sample tracks hover with sub-metre steps that a grid can not
+    # resolve, so their map does not conserve mass to begin with
+    config_file = _read_config(config_file_path)
+    config_file["resources"] = [
+        dict(config_file["resources"][1], input_data_path="tests/data/280320-06-95mm.txt")
+    ]
+    tracks = _TrackStore.from_config(config_file)
+    decimated = _decimate_tracks(tracks, 1)
+    assert len(decimated) < 0.85 * len(tracks)
+    x_grid, y_grid = _generate_grid_density(tracks["easting"], tracks["northing"], 5)
+    expected_density = density_on_grid(tracks, x_grid, y_grid)
+    # Within 0.2 % of the summed density of the full tracks
+    np.testing.assert_allclose(
+        density_on_grid(decimated, x_grid, y_grid).sum(), expected_density.sum(), rtol=2e-3
+    )
+
+
+def test_decimate_tracks_carries_mass_of_removed_rows():
+    # A straight pass that slows down: the kept row must deliver the mass of the slow rows, within
+    # 0.1 % of the summed density of the full tracks
+    n_rows = 40
+    easting = np.arange(n_rows) * 10.0
+    columns = {
+        "easting": easting,
+        "northing": 0.2 * np.sin(easting),
+        "Speed": np.linspace(40, 10, n_rows),
+        "Logging_on": np.ones(n_rows, dtype=np.uint8),
+    }
+    tracks = _TrackStore(columns, np.zeros(n_rows, dtype=int), [(95, 30, uniform)])
+    decimated = _decimate_tracks(tracks, 1)
+    assert len(decimated) == 3
+    x_grid, y_grid = np.meshgrid(np.arange(-20, 420, 2.0), np.arange(-30, 30, 2.0))
+    expected_density = density_on_grid(tracks, x_grid, y_grid)
+    np.testing.assert_allclose(
+        density_on_grid(decimated, x_grid, y_grid).sum(), expected_density.sum(), rtol=1e-3
+    )
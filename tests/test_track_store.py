@@ -0,0 +1,71 @@
+import numpy as np
+from pandas._testing import assert_frame_equal
+
+from nerd.calibration import fit_flow_rate
+from nerd.io import (
+    _TrackStore,
+    _count_tracmap_rows,
+    _create_df_list,
+    _import_multifile_tracmap,
+    _map_resources,
+    _read_config,
+)
+from nerd.mapping import _calculate_total_density
+
+config_file_path = "tests/data/expected_nerd_config.json"
+
+
+def test_from_config():
+    config_file = _read_config(config_file_path)
+    tracks = _TrackStore.from_config(config_file)
+    expected_data = _import_multifile_tracmap(config_file)
+    for name in ["Lat", "Lon", "Speed", "Logging_on", "easting", "northing", "zone_number"]:
+        np.testing.assert_array_equal(tracks[name], expected_data[name])
+    file_lengths = [len(df) for df in _create_df_list(config_file)]
+    np.testing.assert_array_equal(tracks.file_lengths, file_lengths)
+    assert len(tracks) == sum(file_lengths)
+    assert tracks.file_index[0] == 0 and tracks.file_index[-1] == 2
+    assert tracks.file_parameters[1][:2] == (95, 70)
+
+
+def test_from_dataframe():
+    config_file = _read_config(config_file_path)
+    tracks = _TrackStore.from_config(config_file)
+    file_lengths = [
+        _count_tracmap_rows(resource["input_data_path"]) for resource in config_file["resources"]
+    ]
+    np.testing.assert_array_equal(file_lengths, tracks.file_lengths)
+    wrapped = _TrackStore.from_dataframe(tracks.to_dataframe(), config_file, file_lengths)
+    np.testing.assert_array_equal(wrapped.file_index, tracks.file_index)
+    assert wrapped.file_parameters == tracks.file_parameters
+
+
+def test_total_density_from_store():
+    config_file = _read_config(config_file_path)
+    tracks = _TrackStore.from_config(config_file)
+    head = _TrackStore(
+        {name: column[:300] for name, column in tracks.columns.items()},
+        tracks.file_index[:300],
+        tracks.file_parameters,
+    )
+    flow_rate_function = fit_flow_rate([60, 80, 100], [0.5, 1.1, 2.0])
+    _, _, density_from_store = _calculate_total_density(head, config_file, 2, flow_rate_function)
+    _, _, density_from_frame = _calculate_total_density(
+        head.to_dataframe(), config_file, 2, flow_rate_function
+    )
+    np.testing.assert_array_equal(density_from_store, density_from_frame)
+    assert density_from_store.max() > 0
+
+
+def test_from_config_with_workers():
+    config_file = _read_config(config_file_path)
+    serial_tracks = _TrackStore.from_config(config_file)
+    parallel_tracks = _TrackStore.from_config(config_file, n_workers=3, max_pending_files=1)
+    assert_frame_equal(parallel_tracks.to_dataframe(), serial_tracks.to_dataframe())
+    np.testing.assert_array_equal(parallel_tracks.file_index, serial_tracks.file_index)
+
+
+def test_map_resources_keeps_order():
+    config_file = {"resources": [{"input_data_path": str(i)} for i in range(7)]}
+    results = list(_map_resources(int, config_file, n_workers=3, max_pending_files=2))
+    assert results == list(range(7))
@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from nerd.calibration import fit_flow_rate
+from nerd.io import _TrackStore, _TrackStream, _read_config
+from nerd.mapping import _calculate_total_density
+
+config_file_path = "tests/data/expected_nerd_config.json"
+
+
+@pytest.fixture()
+def config_file():
+    return _read_config(config_file_path)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 50, 1000])
+def test_chunks_cover_tracks(config_file, chunk_size):
+    tracks = _TrackStore.from_config(config_file)
+    chunks = list(_TrackStream(config_file, chunk_size))
+    assert all(chunk.n_owned == chunk_size for chunk in chunks[:-1])
+    start = 0
+    for chunk in chunks:
+        rows = np.arange(start - chunk.n_previous, start + len(chunk.tracks) - chunk.n_previous)
+        np.testing.assert_array_equal(chunk.tracks["easting"], tracks["easting"][rows])
+        np.testing.assert_array_equal(chunk.tracks.file_index, tracks.file_index[rows])
+        start += chunk.n_owned
+    assert start == len(tracks)
+    assert chunks[0].n_previous == 0
+
+
+def test_bounds(config_file):
+    tracks = _TrackStore.from_config(config_file)
+    np.testing.assert_array_equal(
+        _TrackStream(config_file, 20).bounds(),
+        [
+            tracks["easting"].min(),
+            tracks["easting"].max(),
+            tracks["northing"].min(),
+            tracks["northing"].max(),
+        ],
+    )
+
+
+def test_streamed_total_density(config_file):
+    tracks = _TrackStore.from_config(config_file)
+    assert tracks["Logging_on"][0] == 1
+    flow_rate_function = fit_flow_rate([60, 80, 100], [0.5, 1.1, 2.0])
+    x_grid, y_grid, expected_density = _calculate_total_density(
+        tracks, config_file, 2, flow_rate_function
+    )
+    for chunk_size in [16, 60]:
+        x_stream, y_stream, streamed_density = _calculate_total_density(
+            _TrackStream(config_file, chunk_size), config_file, 2, flow_rate_function
+        )
+        np.testing.assert_array_equal(x_stream, x_grid)
+        np.testing.assert_array_equal(y_stream, y_grid)
+        np.testing.assert_allclose(streamed_density, expected_density)
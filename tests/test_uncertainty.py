@@ -0,0 +1,146 @@
+import numpy as np
+from unittest import TestCase
+from nerd.calibration import (
+    density_map_percentiles,
+    fit_flow_rate,
+    fit_flow_rate_covariance,
+    model,
+    model_percentiles,
+    sample_flow_rate_coefficients,
+    swath_width_offsets,
+)
+from nerd.density_functions import normal
+
+
+class TestUncertainty(TestCase):
+    def setUp(self) -> None:
+        self.aperture_diameters = np.array([55, 60, 65, 70, 75, 80, 85, 90, 95])
+        flow_rates = 0.0007 * self.aperture_diameters**2 - 0.06 * self.aperture_diameters + 1.7
+        noise = np.random.default_rng(0).normal(0, 0.05, len(self.aperture_diameters))
+        self.flow_rate_function = fit_flow_rate(self.aperture_diameters, flow_rates + noise)
+        self.covariance = fit_flow_rate_covariance(self.aperture_diameters, flow_rates + noise)
+        self.helicopter_speeds = np.array([15, 25, 35])
+        self.swath_width = 60
+
+    def test_covariance_shape(self):
+        assert self.covariance.shape == (3, 3)
+        np.testing.assert_allclose(self.covariance, self.covariance.T)
+
+    def test_sample_flow_rate_coefficients(self):
+        samples = sample_flow_rate_coefficients(
+            self.flow_rate_function.coeffs, self.covariance, 5000, seed=1
+        )
+        assert samples.shape == (5000, 3)
+        np.testing.assert_allclose(
+            samples.mean(axis=0), self.flow_rate_function.coeffs, atol=5e-4, rtol=0.05
+        )
+
+    def test_model_percentiles_without_uncertainty(self):
+        obtained = model_percentiles(
+            self.aperture_diameters,
+            self.helicopter_speeds,
+            self.swath_width,
+            normal,
+            self.flow_rate_function.coeffs,
+            np.zeros((3, 3)),
+            n_draws=10,
+        )
+        expected = model(
+            self.aperture_diameters,
+            self.helicopter_speeds,
+            self.swath_width,
+            normal,
+            self.flow_rate_function,
+        )
+        assert obtained.shape == (3, 3, 9)
+        for percentile in obtained:
+            np.testing.assert_allclose(percentile, expected)
+
+    def test_model_percentiles(self):
+        arguments = (
+            self.aperture_diameters,
+            self.helicopter_speeds,
+            self.swath_width,
+            normal,
+            self.flow_rate_function.coeffs,
+            self.covariance,
+        )
+        serial = model_percentiles(*arguments, swath_width_sd=5, seed=2, chunk_size=300)
+        parallel = model_percentiles(
+            *arguments, swath_width_sd=5, seed=2, chunk_size=300, n_workers=2
+        )
+        np.testing.assert_array_equal(serial, parallel)
+        assert (serial[0] < serial[1]).all()
+        assert (serial[1] < serial[2]).all()
+
+    def test_density_map_percentiles(self):
+        unit_flow_densities = np.stack([np.eye(4), np.ones((4, 4))])
+        apertures = np.array([60, 90])
+        obtained = density_map_percentiles(
+            unit_flow_densities,
+            apertures,
+            self.flow_rate_function.coeffs,
+            np.zeros((3, 3)),
+            n_draws=10,
+            chunk_size=5,
+        )
+        flow_rates = self.flow_rate_function(apertures)
+        expected = flow_rates[0] * np.eye(4) + flow_rates[1] * np.ones((4, 4))
+        assert obtained.shape == (3, 4, 4)
+        for percentile in obtained:
+            np.testing.assert_allclose(percentile, expected)
+        serial = density_map_percentiles(
+            unit_flow_densities, apertures, self.flow_rate_function.coeffs, self.covariance, seed=3
+        )
+        parallel = density_map_percentiles(
+            unit_flow_densities,
+            apertures,
+            self.flow_rate_function.coeffs,
+            self.covariance,
+            seed=3,
+            n_workers=2,
+            chunk_size=4,
+        )
+        np.testing.assert_allclose(serial, parallel)
+
+    def test_density_map_percentiles_grouped_by_width(self):
+        narrow = np.stack([np.eye(4), np.zeros((4, 4))])
+        wide = np.stack([2 * np.eye(4), np.ones((4, 4))])
+        apertures = np.array([60, 90])
+        obtained = density_map_percentiles(
+            np.stack([narrow, wide]),
+            apertures,
+            self.flow_rate_function.coeffs,
+            np.zeros((3, 3)),
+            percentiles=(0, 100),
+            n_draws=10,
+            chunk_size=5,
+            grouped_by_width=True,
+        )
+        flow_rates = self.flow_rate_function(apertures)
+        np.testing.assert_allclose(obtained[0], flow_rates[0] * np.eye(4))
+        np.testing.assert_allclose(
+            obtained[1], 2 * flow_rates[0] * np.eye(4) + flow_rates[1] * np.ones((4, 4))
+        )
+        ungrouped = density_map_percentiles(
+            narrow, apertures, self.flow_rate_function.coeffs, self.covariance, seed=3
+        )
+        one_group = density_map_percentiles(
+            narrow[np.newaxis],
+            apertures,
+            self.flow_rate_function.coeffs,
+            self.covariance,
+            seed=3,
+            grouped_by_width=True,
+        )
+        np.testing.assert_array_equal(one_group, ungrouped)
+
+    def test_swath_width_offsets(self):
+        offsets = swath_width_offsets(5, 4, 1000)
+        np.testing.assert_allclose(offsets, -offsets[::-1])
+        assert (np.diff(offsets) > 0).all()
+        np.testing.assert_allclose(swath_width_offsets(5, 1, 1000), [0], atol=1e-12)
+        # Truncated so that the smallest width stays positive
+        truncated = swath_width_offsets(5, 4, 5)
+        assert (truncated > -5).all()
+        assert (truncated > offsets).all()